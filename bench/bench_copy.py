@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from copyengine import COPY_MODES, copy_files
+
+
+def make_tree(root, small_files=2000, large_files=4, large_size=32 * 1024 * 1024):
+    pairs = []
+    for i in range(small_files):
+        path = os.path.join(root, f"dir{i % 20}", f"small{i}.bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(4096))
+        pairs.append(path)
+    for i in range(large_files):
+        path = os.path.join(root, f"large{i}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(large_size))
+        pairs.append(path)
+    return pairs
+
+
+def serial_shutil(pairs):
+    total = 0
+    for from_path, dest_path in pairs:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy2(from_path, dest_path)
+        total += os.stat(dest_path).st_size
+    return total
+
+
+def run(label, copy, pairs, dest_root):
+    shutil.rmtree(dest_root, ignore_errors=True)
+    start = time.perf_counter()
+    total = copy(pairs)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {label:<22} {total / elapsed / 1024 / 1024:9.1f} MB/s "
+        f"{len(pairs) / elapsed:9.0f} files/s ({elapsed:.2f}s)"
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        src_root = os.path.join(tmp, "src")
+        dest_root = os.path.join(tmp, "dest")
+        sources = make_tree(src_root)
+        pairs = [(path, os.path.join(dest_root, os.path.relpath(path, src_root))) for path in sources]
+        print(f"{len(pairs)} files")
+        run("serial shutil.copy2", serial_shutil, pairs, dest_root)
+        for mode in COPY_MODES:
+            for workers in [1, 4, 16]:
+                run(
+                    f"{mode} x{workers}",
+                    lambda p, mode=mode, workers=workers: copy_files(p, mode, workers),
+                    pairs,
+                    dest_root,
+                )
+
+
+if __name__ == "__main__":
+    main()
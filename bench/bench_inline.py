@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synth import make_paragraphs
+from text_to_textnodes import text_to_textnodes
+
+
+# the speedup the single-pass scanner was asked to reach on every input
+TARGET_SPEEDUP = 3.0
+
+
+def throughput(paragraphs, repeat=15):
+    # (five-pass MB/s, single-pass MB/s); the runs alternate so both see the
+    # same machine state, which keeps their ratio steadier than their speeds
+    total_bytes = sum(len(p) for p in paragraphs)
+    best = {False: None, True: None}
+    for _ in range(repeat):
+        for single_pass in best:
+            start = time.perf_counter()
+            for paragraph in paragraphs:
+                text_to_textnodes(paragraph, single_pass)
+            elapsed = time.perf_counter() - start
+            if best[single_pass] is None or elapsed < best[single_pass]:
+                best[single_pass] = elapsed
+    return total_bytes / best[False] / 1024 / 1024, total_bytes / best[True] / 1024 / 1024
+
+
+def main():
+    # markup is the share of formatted words relative to 15% per word
+    for markup in [1.0, 0.3, 0.0]:
+        paragraphs = make_paragraphs(2 * 1024 * 1024, markup=markup)
+        for paragraph in paragraphs[:200]:
+            assert text_to_textnodes(paragraph, True) == text_to_textnodes(paragraph, False)
+        multipass, single = throughput(paragraphs)
+        speedup = single / multipass
+        status = "met" if speedup >= TARGET_SPEEDUP else "NOT met"
+        print(f"markup {markup:.1f} ({len(paragraphs)} paragraphs)")
+        print(f"  five-pass pipeline: {multipass:8.2f} MB/s")
+        print(f"  single-pass scan:   {single:8.2f} MB/s")
+        print(f"  speedup:            {speedup:8.2f}x ({TARGET_SPEEDUP:.1f}x target {status})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from leafnode import LeafNode
+from markdown_to_html_node import markdown_to_html_node
+from parentnode import ParentNode
+from synth import make_markdown
+from textnode import TextNode, TextType
+
+
+class DictNode:
+    # same fields as HTMLNode, but with a per-instance __dict__
+    def __init__(self, tag, value, children, props):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+def bytes_per_node(factory, count=200_000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    list_bytes = sys.getsizeof(nodes)
+    return (after - before - list_bytes) / len(nodes)
+
+
+def count_nodes(root):
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.children:
+            stack.extend(node.children)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Node memory benchmark")
+    parser.add_argument("--size-mb", type=float, default=50)
+    args = parser.parse_args()
+
+    text = "shared"
+    children = [LeafNode("b", text)]
+    factories = [
+        ("TextNode", lambda i: TextNode(text, TextType.BOLD)),
+        ("LeafNode", lambda i: LeafNode("b", text)),
+        ("ParentNode", lambda i: ParentNode("p", children)),
+        ("dict-based node", lambda i: DictNode("b", text, None, None)),
+    ]
+    print("bytes per node (excluding shared strings and child lists)")
+    for name, factory in factories:
+        print(f"  {name:<16} {bytes_per_node(factory):8.1f}")
+
+    markdown = make_markdown(int(args.size_mb * 1024 * 1024))
+    start = time.perf_counter()
+    root = markdown_to_html_node(markdown)
+    elapsed = time.perf_counter() - start
+    nodes = count_nodes(root)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"corpus:      {len(markdown) / 1024 / 1024:.1f} MB")
+    print(f"parse time:  {elapsed:.2f} s")
+    print(f"html nodes:  {nodes}")
+    print(f"peak RSS:    {peak_rss_kb / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
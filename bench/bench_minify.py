@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from gencontent import PageOptions, generate_page
+from minify import minify_chunks
+from synth import make_markdown
+
+
+TEMPLATE_PATH = os.path.join(ROOT_DIR, "template.html")
+DEFAULT_SIZES = [10 * 1024, 100 * 1024, 1024 * 1024]
+
+
+def best_time(func, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def measure(name, source_path, tmp_dir_path, runs):
+    plain_path = os.path.join(tmp_dir_path, "plain.html")
+    minified_path = os.path.join(tmp_dir_path, "minified.html")
+    plain = best_time(lambda: generate_page(source_path, TEMPLATE_PATH, plain_path, "/base/"), runs)
+    minified = best_time(
+        lambda: generate_page(source_path, TEMPLATE_PATH, minified_path, "/base/", PageOptions(minify=True)), runs
+    )
+    with open(plain_path, "r") as f:
+        html = f.read()
+    # the minifier alone, fed in the chunk sizes the renderer produces
+    chunks = [html[i : i + 4096] for i in range(0, len(html), 4096)]
+    alone = best_time(lambda: "".join(minify_chunks(chunks)), runs)
+    plain_bytes = os.path.getsize(plain_path)
+    minified_bytes = os.path.getsize(minified_path)
+    mb = plain_bytes / 2**20
+    print(
+        f"{name:<10} {plain_bytes:>10} -> {minified_bytes:>10} B ({1 - minified_bytes / plain_bytes:6.1%} saved) "
+        f"build {plain * 1000:8.2f} -> {minified * 1000:8.2f} ms (+{(minified - plain) * 1000 / mb:7.1f} ms/MB) "
+        f"minifier {mb / alone:6.1f} MB/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes saved and build time added by --minify")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="synthetic page sizes in bytes")
+    parser.add_argument("--markup", type=float, default=1.0, help="inline formatting, links and images density")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir_path:
+        for dir_path, dir_names, filenames in os.walk(os.path.join(ROOT_DIR, "content")):
+            dir_names.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dir_path, filename)
+                measure(os.path.relpath(path, os.path.join(ROOT_DIR, "content")), path, tmp_dir_path, args.runs)
+        for size in args.sizes:
+            source_path = os.path.join(tmp_dir_path, "page.md")
+            with open(source_path, "w") as f:
+                f.write(make_markdown(size, seed=size, title="Synthetic", markup=args.markup))
+            measure(f"{size // 1024}KB", source_path, tmp_dir_path, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import cProfile
+import json
+import math
+import os
+import pstats
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from synth import DEFAULT_MIX, make_markdown
+
+
+DEFAULT_PAGES = [100, 1000, 10000]
+STATIC_FILES = 20
+
+
+def make_site(root, pages, depth=2, fanout=10, mean_size=4096, size_sigma=0.8, mix=None, markup=1.0, seed=0):
+    # Pages are spread over a depth-level tree of fanout directories per
+    # level; sizes follow a log-normal distribution around mean_size.
+    rng = random.Random(seed)
+    # lognormvariate(0, sigma) has mean exp(sigma^2 / 2)
+    scale = mean_size / math.exp(size_sigma**2 / 2)
+    for i in range(pages):
+        dirs = [f"section{(i // fanout ** (level + 1)) % fanout}" for level in range(depth)]
+        size = int(rng.lognormvariate(0, size_sigma) * scale)
+        name = "index.md" if i == 0 else f"page{i}.md"
+        path = os.path.join(root, "content", *([] if i == 0 else dirs), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(make_markdown(size, seed=seed * 1_000_003 + i, title=f"Page {i}", mix=mix, markup=markup))
+    for i in range(STATIC_FILES):
+        path = os.path.join(root, "static", "images", f"image{i}.png")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(16 * 1024))
+    shutil.copy(os.path.join(ROOT_DIR, "template.html"), os.path.join(root, "template.html"))
+
+
+def dir_size(dir_path):
+    total = 0
+    files = 0
+    for dir_path, dir_names, filenames in os.walk(dir_path):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(dir_path, filename))
+            files += 1
+    return total, files
+
+
+def build_once(site_root, build_args, profile_top):
+    # runs main()'s whole pipeline inside site_root; meant for a fresh
+    # process so ru_maxrss is this build's peak
+    import main
+
+    os.chdir(site_root)
+    profiler = cProfile.Profile() if profile_top else None
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if profiler is not None:
+            profiler.enable()
+        main.main(build_args)
+        if profiler is not None:
+            profiler.disable()
+    wall = time.perf_counter() - start
+    output_bytes, output_files = dir_size("docs")
+    result = {
+        "wall_seconds": wall,
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        # largest single pool worker when building with --jobs
+        "peak_worker_rss_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024,
+        "output_bytes": output_bytes,
+        "output_files": output_files,
+    }
+    if profiler is not None:
+        stats = pstats.Stats(profiler)
+        rows = []
+        for (filename, line, name), (cc, nc, tt, ct, callers) in stats.stats.items():
+            rows.append({"function": f"{os.path.basename(filename)}:{name}", "calls": nc, "seconds": tt})
+        rows.sort(key=lambda row: row["seconds"], reverse=True)
+        result["profile"] = rows[:profile_top]
+    return result
+
+
+def run_point(args, pages):
+    with tempfile.TemporaryDirectory() as site_root:
+        mix = json.loads(args.mix) if args.mix else None
+        start = time.perf_counter()
+        make_site(site_root, pages, args.depth, args.fanout, args.mean_size, args.size_sigma, mix, args.markup, args.seed)
+        generated = time.perf_counter() - start
+        input_bytes, _ = dir_size(os.path.join(site_root, "content"))
+        command = [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--child",
+            site_root,
+            "--profile",
+            str(args.profile),
+            "--",
+        ] + args.build_args
+        child = subprocess.run(command, check=True, capture_output=True, text=True)
+        result = json.loads(child.stdout)
+    result["pages"] = pages
+    result["input_bytes"] = input_bytes
+    result["generate_seconds"] = generated
+    result["pages_per_sec"] = pages / result["wall_seconds"]
+    result["us_per_page"] = result["wall_seconds"] * 1e6 / pages
+    return result
+
+
+def print_curve(results):
+    base = results[0]["us_per_page"]
+    print(
+        f"{'pages':>8} {'wall s':>9} {'pages/s':>9} {'us/page':>9} {'vs first':>8} "
+        f"{'peak RSS':>10} {'RSS/page':>9} {'output':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['pages']:>8} {result['wall_seconds']:9.2f} {result['pages_per_sec']:9.0f} "
+            f"{result['us_per_page']:9.0f} {result['us_per_page'] / base:7.2f}x "
+            f"{result['peak_rss_bytes'] / 2**20:8.1f}MB {result['peak_rss_bytes'] / result['pages'] / 1024:7.1f}KB "
+            f"{result['output_bytes'] / 2**20:8.1f}MB"
+        )
+    for result in results:
+        if "profile" not in result:
+            continue
+        print(f"\nTop functions by own time at {result['pages']} pages (us per page):")
+        for row in result["profile"]:
+            per_page = row["seconds"] * 1e6 / result["pages"]
+            print(f"  {per_page:9.1f} {row['calls'] / result['pages']:9.1f} calls/page  {row['function']}")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        site_root = sys.argv[2]
+        profile_top = int(sys.argv[4])
+        build_args = sys.argv[sys.argv.index("--") + 1 :]
+        print(json.dumps(build_once(site_root, build_args, profile_top)))
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Build synthetic sites of growing size and report the scaling curve",
+        epilog="arguments after -- are passed to main.py, e.g. -- --jobs 4",
+    )
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES)
+    parser.add_argument("--depth", type=int, default=2, help="directory levels under content/")
+    parser.add_argument("--fanout", type=int, default=10, help="directories per level")
+    parser.add_argument("--mean-size", type=int, default=4096, help="mean page size in bytes")
+    parser.add_argument("--size-sigma", type=float, default=0.8, help="log-normal spread of page sizes")
+    parser.add_argument(
+        "--mix",
+        help=f"JSON block weights, default {json.dumps(DEFAULT_MIX)}",
+    )
+    parser.add_argument("--markup", type=float, default=1.0, help="inline formatting, links and images density")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", type=int, default=0, metavar="N", help="show the N most expensive functions")
+    parser.add_argument("--output", metavar="PATH", help="save the curve as JSON")
+    argv = sys.argv[1:]
+    build_args = []
+    if "--" in argv:
+        build_args = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+    args = parser.parse_args(argv)
+    args.build_args = build_args
+
+    results = []
+    for pages in sorted(args.pages):
+        result = run_point(args, pages)
+        results.append(result)
+        print(f"{pages} pages: {result['wall_seconds']:.2f}s", file=sys.stderr)
+    print_curve(results)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            settings = {name: value for name, value in vars(args).items() if name != "output"}
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from devserver import PollingWatcher, SiteState
+from synth import make_markdown
+
+
+def make_site(root, pages, page_size):
+    content = os.path.join(root, "content")
+    for i in range(pages):
+        path = os.path.join(content, f"section{i % 50}", f"page{i}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(make_markdown(page_size, seed=i, title=f"Page {i}"))
+    os.makedirs(os.path.join(root, "static"))
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=4096)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_site(root, args.pages, args.page_size)
+        site = SiteState(
+            os.path.join(root, "content"),
+            os.path.join(root, "static"),
+            os.path.join(root, "template.html"),
+            os.path.join(root, "docs"),
+        )
+        start = time.perf_counter()
+        site.build()
+        print(f"{args.pages} pages, initial build {time.perf_counter() - start:.2f}s")
+        watcher = PollingWatcher(site.watched_paths())
+
+        timings = []
+        for i in range(args.edits):
+            path = os.path.join(root, "content", f"section{i % 50}", f"page{i}.md")
+            with open(path, "a") as f:
+                f.write(f"\nedit number {i}\n")
+            start = time.perf_counter()
+            changed, removed = watcher.poll()
+            poll_done = time.perf_counter()
+            outputs = site.apply(changed, removed)
+            done = time.perf_counter()
+            assert len(outputs) == 1
+            timings.append(((poll_done - start) * 1000, (done - poll_done) * 1000))
+
+        polls = sorted(t[0] for t in timings)
+        renders = sorted(t[1] for t in timings)
+        totals = sorted(sum(t) for t in timings)
+        print(f"  poll:   median {polls[len(polls) // 2]:6.1f} ms, max {polls[-1]:6.1f} ms")
+        print(f"  render: median {renders[len(renders) // 2]:6.1f} ms, max {renders[-1]:6.1f} ms")
+        print(f"  total:  median {totals[len(totals) // 2]:6.1f} ms, max {totals[-1]:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
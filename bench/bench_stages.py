@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from block_to_block_type import block_to_block_type
+from gencontent import extract_title, generate_page
+from markdown_to_blocks import markdown_to_blocks
+from markdown_to_html_node import blocks_to_html_node, markdown_to_html_node
+from scan_blocks import scan_blocks
+from synth import make_markdown
+from text_node_to_html_node import text_node_to_html_node
+from text_to_textnodes import text_to_textnodes
+
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+DEFAULT_THRESHOLD = 0.10
+STAGES = [
+    "scan_blocks",
+    "blocks_to_html_node",
+    "text_to_textnodes",
+    "text_node_to_html_node",
+    "ParentNode.to_html",
+    "extract_title",
+    "generate_page",
+]
+# the split-based block functions the build used before scan_blocks; only
+# timed when asked for with --stages
+LEGACY_STAGES = ["legacy.markdown_to_blocks", "legacy.block_to_block_type"]
+
+
+def real_markdown():
+    # every page under content/, in a stable order
+    pages = []
+    for dir_path, dir_names, filenames in os.walk(os.path.join(ROOT_DIR, "content")):
+        dir_names.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".md"):
+                with open(os.path.join(dir_path, filename), "r") as f:
+                    pages.append(f.read())
+    return "\n\n".join(pages)
+
+
+def make_stages(markdown, tmp_dir_path):
+    # returns {stage name: zero-argument callable over the whole input}
+    lines = markdown.split("\n")
+    scanned = list(scan_blocks(lines))
+    paragraphs = ["\n".join(block_lines) for block_type, block_lines in scanned if block_type.value == "paragraph"]
+    blocks = markdown_to_blocks(markdown)
+    text_nodes = [node for paragraph in paragraphs for node in text_to_textnodes(paragraph.replace("\n", " "))]
+    tree = markdown_to_html_node(markdown)
+    source_path = os.path.join(tmp_dir_path, "page.md")
+    dest_path = os.path.join(tmp_dir_path, "page.html")
+    template_path = os.path.join(ROOT_DIR, "template.html")
+    with open(source_path, "w") as f:
+        f.write(markdown)
+    return {
+        # block boundaries and types, in one pass as the build does
+        "scan_blocks": lambda: list(scan_blocks(markdown.split("\n"))),
+        # every block's inline parse and html nodes, short of serializing
+        "blocks_to_html_node": lambda: blocks_to_html_node(scanned),
+        "text_to_textnodes": lambda: [text_to_textnodes(paragraph.replace("\n", " ")) for paragraph in paragraphs],
+        "text_node_to_html_node": lambda: [text_node_to_html_node(node) for node in text_nodes],
+        "ParentNode.to_html": tree.to_html,
+        "extract_title": lambda: extract_title(markdown),
+        "generate_page": lambda: generate_page(source_path, template_path, dest_path, "/"),
+        "legacy.markdown_to_blocks": lambda: markdown_to_blocks(markdown),
+        "legacy.block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+    }
+
+
+def time_stage(func, min_time, max_runs):
+    # best of as many runs as fit in min_time, at least one
+    best = None
+    runs = 0
+    started = time.perf_counter()
+    while runs < max_runs:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        runs += 1
+        if best is None or elapsed < best:
+            best = elapsed
+        if time.perf_counter() - started >= min_time:
+            break
+    return best, runs
+
+
+def measure_allocations(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": peak, "retained_bytes": current, "retained_blocks": blocks}
+
+
+def run(inputs, stages, min_time, max_runs, allocations):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir_path:
+        for input_name, markdown in inputs:
+            size = len(markdown.encode("utf-8"))
+            funcs = make_stages(markdown, tmp_dir_path)
+            for stage in stages:
+                best, runs = time_stage(funcs[stage], min_time, max_runs)
+                result = {
+                    "stage": stage,
+                    "input": input_name,
+                    "bytes": size,
+                    "runs": runs,
+                    "seconds": best,
+                    "ops_per_sec": 1 / best if best > 0 else float("inf"),
+                    "ns_per_byte": best * 1e9 / size,
+                }
+                if allocations:
+                    result["allocations"] = measure_allocations(funcs[stage])
+                results[f"{stage}@{input_name}"] = result
+                print(format_result(result))
+    return results
+
+
+def format_result(result):
+    line = (
+        f"{result['stage']:<28} {result['input']:<8} {result['ops_per_sec']:12.1f} ops/s "
+        f"{result['ns_per_byte']:10.2f} ns/B"
+    )
+    allocations = result.get("allocations")
+    if allocations is not None:
+        line += f" {allocations['peak_bytes'] / 1024:12.1f} KB peak {allocations['retained_blocks']:9d} blocks"
+    return line
+
+
+def compare(old_results, new_results, threshold):
+    # returns the keys whose ns/byte grew by more than threshold
+    regressions = []
+    for key in sorted(new_results):
+        old = old_results.get(key)
+        if old is None:
+            continue
+        ratio = new_results[key]["ns_per_byte"] / old["ns_per_byte"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<36} {old['ns_per_byte']:10.2f} -> {new_results[key]['ns_per_byte']:10.2f} ns/B ({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def size_label(size):
+    if size >= 1024 * 1024:
+        return f"{size // (1024 * 1024)}MB"
+    return f"{size // 1024}KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage benchmark of the markdown pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="synthetic input sizes in bytes")
+    parser.add_argument("--stages", nargs="+", choices=STAGES + LEGACY_STAGES, default=STAGES)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent timing each stage")
+    parser.add_argument("--max-runs", type=int, default=1000)
+    parser.add_argument("--no-allocations", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a previous JSON result")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed ns/byte growth")
+    args = parser.parse_args()
+
+    inputs = [("real", real_markdown())]
+    inputs.extend((size_label(size), make_markdown(size, seed=size)) for size in args.sizes)
+    results = run(inputs, args.stages, args.min_time, args.max_runs, not args.no_allocations)
+
+    if args.output is not None:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            old_results = json.load(f)["results"]
+        regressions = compare(old_results, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
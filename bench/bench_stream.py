@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synth import make_markdown
+
+
+def write_source(path, size_mb):
+    # repeats a 1 MB synthetic body, so only the first block is a title
+    body = make_markdown(1024 * 1024, seed=1).split("\n\n", 1)[1]
+    with open(path, "w") as f:
+        f.write("# Reference page\n\n")
+        for _ in range(int(size_mb)):
+            f.write(body)
+            f.write("\n")
+
+
+def render_once(source_path, dest_path, stream):
+    from gencontent import PageOptions, generate_page
+
+    template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+    options = PageOptions(stream_bytes=0 if stream else None)
+    start = time.perf_counter()
+    generate_page(source_path, template_path, dest_path, "/base/", options)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {"seconds": elapsed, "peak_rss_bytes": peak, "output_bytes": os.path.getsize(dest_path)}
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        print(json.dumps(render_once(sys.argv[2], sys.argv[3], sys.argv[4] == "stream")))
+        return
+    parser = argparse.ArgumentParser(description="Peak memory of whole-file versus streaming page rendering")
+    parser.add_argument("--size-mb", type=float, nargs="+", default=[10, 100])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.size_mb:
+            source_path = os.path.join(tmp, "page.md")
+            write_source(source_path, size_mb)
+            print(f"{os.path.getsize(source_path) / 2**20:.0f} MB source")
+            for mode in ["whole", "stream"]:
+                dest_path = os.path.join(tmp, f"{mode}.html")
+                command = [sys.executable, os.path.abspath(__file__), "--child", source_path, dest_path, mode]
+                result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+                print(
+                    f"  {mode:<7} {result['seconds']:7.2f}s {result['peak_rss_bytes'] / 2**20:9.1f} MB peak RSS "
+                    f"{result['output_bytes'] / 2**20:9.1f} MB output"
+                )
+            with open(os.path.join(tmp, "whole.html"), "rb") as a, open(os.path.join(tmp, "stream.html"), "rb") as b:
+                assert a.read() == b.read()
+
+
+if __name__ == "__main__":
+    main()
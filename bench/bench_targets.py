@@ -0,0 +1,52 @@
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from bench_scale import make_site
+from gencontent import generate_pages_recursive, generate_targets
+
+
+BASEPATHS = ["/", "/preview/", "/staging/", "/static-site-generator/"]
+
+
+def timed(func):
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One render per page for several basepaths versus one build each")
+    parser.add_argument("--pages", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_site(root, args.pages)
+        content = os.path.join(root, "content")
+        template = os.path.join(root, "template.html")
+        print(f"{args.pages} pages")
+        print(f"{'targets':>8} {'separate s':>11} {'one render s':>13} {'speedup':>8}")
+        for count in range(1, len(BASEPATHS) + 1):
+            targets = [(os.path.join(root, f"out{i}"), basepath) for i, basepath in enumerate(BASEPATHS[:count])]
+
+            def separate():
+                for dest_dir_path, basepath in targets:
+                    generate_pages_recursive(content, template, dest_dir_path, basepath)
+
+            separate_seconds = timed(separate)
+            for dest_dir_path, _ in targets:
+                shutil.rmtree(dest_dir_path)
+            combined_seconds = timed(lambda: generate_targets(content, template, targets))
+            print(f"{count:>8} {separate_seconds:11.2f} {combined_seconds:13.2f} {separate_seconds / combined_seconds:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
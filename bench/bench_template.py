@@ -0,0 +1,60 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from template import load_template
+from urls import url_resolver
+
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+BASEPATH = "/static-site-generator/"
+SIZES = [10 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+
+def make_html(size, basepath="/"):
+    # the compiled path gets content whose urls were resolved while building nodes
+    prefix = url_resolver(basepath).prefix
+    chunk = '<p>Some <b>bold</b> text with a <a href="/blog/post">link</a> and <img src="/images/a.png" alt="a"></p>'
+    count = size // len(chunk) + 1
+    return chunk.replace('="/', '="' + prefix) * count
+
+
+def fill_per_page(html, basepath=BASEPATH):
+    with open(TEMPLATE_PATH, "r") as f:
+        template = f.read()
+    template = template.replace("{{ Title }}", "Title")
+    template = template.replace("{{ Content }}", html)
+    template = template.replace('href="/', 'href="' + basepath)
+    template = template.replace('src="/', 'src="' + basepath)
+    return template
+
+
+def fill_compiled(html, basepath=BASEPATH):
+    template = load_template(TEMPLATE_PATH, basepath)
+    return template.render(Title="Title", Content=html)
+
+
+def time_per_call(func, size):
+    number = max(3, 20_000_000 // size)
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    assert fill_per_page(make_html(1000)) == fill_compiled(make_html(1000, BASEPATH))
+    # basepath "/" isolates the template overhead; with BASEPATH the per-page
+    # version also rewrites every url in the content
+    for basepath in ["/", BASEPATH]:
+        print(f"basepath {basepath!r}")
+        print(f"{'page size':>12} {'before us/page':>16} {'after us/page':>16} {'speedup':>8}")
+        for size in SIZES:
+            html = make_html(size)
+            resolved = make_html(size, basepath)
+            before = time_per_call(lambda: fill_per_page(html, basepath), size)
+            after = time_per_call(lambda: fill_compiled(resolved, basepath), size)
+            print(f"{size:>12} {before * 1e6:>16.1f} {after * 1e6:>16.1f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import random
+
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog hobbit ring shire elves dwarves "
+    "wizard mountain river forest road journey tale song fire shadow light"
+).split()
+
+
+def make_sentence(rng, words=12, markup=1.0):
+    # markup scales how often a word gets inline formatting (15% at 1.0)
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll >= 0.15 * markup:
+            parts.append(word)
+            continue
+        roll /= markup
+        if roll < 0.05:
+            word = f"**{word}**"
+        elif roll < 0.09:
+            word = f"_{word}_"
+        elif roll < 0.12:
+            word = f"`{word}`"
+        elif roll < 0.14:
+            word = f"[{word}](/blog/{rng.choice(WORDS)})"
+        else:
+            word = f"![{word}](/images/{rng.choice(WORDS)}.png)"
+        parts.append(word)
+    return " ".join(parts)
+
+
+DEFAULT_MIX = {
+    "heading": 0.1,
+    "unordered_list": 0.1,
+    "ordered_list": 0.1,
+    "quote": 0.07,
+    "code": 0.08,
+    "paragraph": 0.55,
+}
+
+
+def make_block(rng, mix=None, markup=1.0):
+    # mix: relative weights of the block kinds in DEFAULT_MIX
+    if mix is None:
+        mix = DEFAULT_MIX
+    roll = rng.random() * sum(mix.values())
+    kind = "paragraph"
+    for name, weight in mix.items():
+        if roll < weight:
+            kind = name
+            break
+        roll -= weight
+    if kind == "heading":
+        return "#" * rng.randint(2, 4) + " " + make_sentence(rng, 5, markup)
+    if kind == "unordered_list":
+        return "\n".join(f"- {make_sentence(rng, 6, markup)}" for _ in range(rng.randint(2, 6)))
+    if kind == "ordered_list":
+        return "\n".join(f"{i + 1}. {make_sentence(rng, 6, markup)}" for i in range(rng.randint(2, 6)))
+    if kind == "quote":
+        return "\n".join(f"> {make_sentence(rng, 8, markup)}" for _ in range(rng.randint(1, 4)))
+    if kind == "code":
+        lines = [" ".join(rng.choice(WORDS) for _ in range(6)) for _ in range(rng.randint(2, 8))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    return "\n".join(make_sentence(rng, 12, markup) for _ in range(rng.randint(1, 5)))
+
+
+def make_markdown(size, seed=0, title="Synthetic page", mix=None, markup=1.0):
+    rng = random.Random(seed)
+    blocks = [f"# {title}"]
+    total = len(blocks[0])
+    while total < size:
+        block = make_block(rng, mix, markup)
+        blocks.append(block)
+        total += len(block) + 2
+    return "\n\n".join(blocks) + "\n"
+
+
+def make_paragraphs(size, seed=0, markup=1.0):
+    rng = random.Random(seed)
+    paragraphs = []
+    total = 0
+    while total < size:
+        paragraph = make_sentence(rng, 40, markup)
+        paragraphs.append(paragraph)
+        total += len(paragraph)
+    return paragraphs
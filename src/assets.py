@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import posixpath
+
+from copystatic import collect_files
+from manifest import hash_file
+from outputsync import sync_bytes
+from statcache import StatCache
+
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+DEFAULT_HASH_CACHE_PATH = "./.cache/asset-hashes.json"
+HASH_LENGTH = 10
+
+
+class AssetManifest:
+    def __init__(self, names):
+        # names: {static rel path: fingerprinted rel path}, "/"-separated
+        self.names = names
+        self.urls = {"/" + rel_path: "/" + name for rel_path, name in names.items()}
+        self.digest = hashlib.sha256(json.dumps(names, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprint_assets(source_dir_path, hash_cache_path=DEFAULT_HASH_CACHE_PATH):
+    cache = StatCache(hash_cache_path)
+    names = {}
+    for rel_path in collect_files(source_dir_path):
+        digest = cache.get(os.path.join(source_dir_path, rel_path), hash_file)
+        rel_path = rel_path.replace(os.sep, "/")
+        names[rel_path] = fingerprint_name(rel_path, digest)
+    cache.save()
+    print(f"Fingerprinted {len(names)} assets: {cache.computed} hashed, {cache.reused} unchanged")
+    return AssetManifest(names)
+
+
+def fingerprint_name(rel_path, digest):
+    # "images/tom.png" -> "images/tom.<hash>.png"
+    root, ext = posixpath.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def write_asset_manifest(dest_dir_path, assets):
+    # returns (path, changed) like copy_files_recursive's outputs
+    path = os.path.join(dest_dir_path, ASSET_MANIFEST_NAME)
+    data = json.dumps(assets.names, indent=2, sort_keys=True) + "\n"
+    return path, sync_bytes(path, data.encode("utf-8"))
+
+
+def remove_asset_manifest(dest_dir_path, static):
+    # for builds without fingerprinting: removes the manifest an earlier run
+    # wrote, unless the static files have one of their own
+    path = os.path.join(dest_dir_path, ASSET_MANIFEST_NAME)
+    if not os.path.exists(path) or any(os.path.abspath(p) == os.path.abspath(path) for p, _ in static["outputs"]):
+        return []
+    os.remove(path)
+    return [path]
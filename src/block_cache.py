@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from manifest import GENERATOR_VERSION
+
+
+DEFAULT_CACHE_PATH = "./.cache/blocks.sqlite"
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+
+_open_caches = {}
+
+
+class BlockCache:
+    def __init__(self, path=None, memory_bytes=DEFAULT_MEMORY_BYTES, disk_bytes=DEFAULT_DISK_BYTES):
+        self.path = path
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.max_memory_bytes = memory_bytes
+        self.max_disk_bytes = disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # rows and use times written by the next flush, so the database lock
+        # is only held for one short transaction per page
+        self.pending = {}
+        self.used = {}
+        self.db = None
+        if path is not None:
+            dir_path = os.path.dirname(path)
+            if dir_path != "":
+                os.makedirs(dir_path, exist_ok=True)
+            self.db = sqlite3.connect(path, timeout=60)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, html TEXT NOT NULL, "
+                "nodes INTEGER NOT NULL, links TEXT NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    def key(self, lines, context=""):
+        text = "\0".join([GENERATOR_VERSION, context, "\n".join(lines)])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        # returns (html, node count, links) or None
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return entry
+        if self.db is not None:
+            row = self.pending.get(key)
+            if row is None:
+                row = self.db.execute("SELECT html, nodes, links FROM blocks WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (row[0], row[1], tuple(json.loads(row[2])))
+                self.used[key] = time.time()
+                self.disk_hits += 1
+                self.remember(key, entry)
+                return entry
+        self.misses += 1
+        return None
+
+    def put(self, key, html, nodes=1, links=()):
+        # nodes: how many html nodes the block was rendered from; links: the
+        # urls its resolver returned, replayed for the link checker on a hit
+        links = tuple(links)
+        self.remember(key, (html, nodes, links))
+        if self.db is not None:
+            self.pending[key] = (html, nodes, json.dumps(links), len(html), time.time())
+
+    def remember(self, key, entry):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return
+        self.memory[key] = entry
+        self.memory_bytes += len(entry[0])
+        while self.memory_bytes > self.max_memory_bytes and self.memory:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted[0])
+
+    def flush(self):
+        if self.db is None or not (self.pending or self.used):
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, nodes, links, size, used) VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, *row) for key, row in self.pending.items()],
+            )
+            self.db.executemany(
+                "UPDATE blocks SET used = ? WHERE key = ?", [(used, key) for key, used in self.used.items()]
+            )
+        self.pending = {}
+        self.used = {}
+
+    def evict(self):
+        # drop least recently used rows until the table fits in max_disk_bytes
+        if self.db is None:
+            return 0
+        self.flush()
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+        removed = 0
+        if total > self.max_disk_bytes:
+            rows = self.db.execute("SELECT key, size FROM blocks ORDER BY used, key").fetchall()
+            keys = []
+            for key, size in rows:
+                if total <= self.max_disk_bytes:
+                    break
+                keys.append((key,))
+                total -= size
+            self.db.executemany("DELETE FROM blocks WHERE key = ?", keys)
+            removed = len(keys)
+        self.db.commit()
+        return removed
+
+    def counters(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def close(self):
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
+
+
+def open_block_cache(path):
+    # one cache per process and path, so pool workers reuse their LRU layer
+    cache = _open_caches.get(path)
+    if cache is None:
+        cache = BlockCache(path)
+        _open_caches[path] = cache
+    return cache
@@ -0,0 +1,136 @@
+import json
+import os
+import time
+
+
+REPORT_VERSION = "1"
+DEFAULT_TOP = 10
+DEFAULT_THRESHOLD = 0.25
+# render times below this many milliseconds are too noisy to compare
+MIN_COMPARE_MS = 1.0
+
+
+class ReportOptions:
+    def __init__(self, path, baseline_path=None, top=DEFAULT_TOP, threshold=DEFAULT_THRESHOLD):
+        # path: where the report is written
+        # baseline_path: previous report to compare with, defaults to path
+        # threshold: relative growth of render time or output size to flag
+        self.path = path
+        self.baseline_path = baseline_path if baseline_path is not None else path
+        self.top = top
+        self.threshold = threshold
+
+
+def write_build_report(report_options, results, dest_dir_path):
+    baseline = load_report(report_options.baseline_path)
+    report = build_report(results, dest_dir_path, baseline, report_options.top)
+    report["regressions"] = compare_reports(baseline, report, report_options.threshold)
+    save_report(report_options.path, report)
+    print_report(report, report_options.path)
+    return report
+
+
+def build_report(results, dest_dir_path, baseline=None, top=DEFAULT_TOP):
+    # Pages skipped by an incremental build keep their entry from the
+    # baseline, so the report always covers the whole site.
+    old_pages = baseline["pages"] if baseline is not None else {}
+    pages = {}
+    skipped = 0
+    for result in results:
+        if result.get("removed"):
+            continue
+        rel_path = os.path.relpath(result["dest_path"], dest_dir_path)
+        if "stats" in result:
+            stats = dict(result["stats"])
+            stats["total_ms"] = stats["phases_ms"].get("page", 0.0)
+            pages[rel_path] = stats
+        elif rel_path in old_pages:
+            pages[rel_path] = dict(old_pages[rel_path], skipped=True)
+            skipped += 1
+
+    rendered = [stats for stats in pages.values() if not stats.get("skipped")]
+    phases = {}
+    for stats in rendered:
+        for name, ms in stats["phases_ms"].items():
+            phases[name] = phases.get(name, 0.0) + ms
+    totals = {
+        "pages": len(pages),
+        "rendered": len(rendered),
+        "skipped": skipped,
+        "input_bytes": sum(stats["input_bytes"] for stats in pages.values()),
+        "output_bytes": sum(stats["output_bytes"] for stats in pages.values()),
+        "blocks": sum(stats["blocks"] for stats in pages.values()),
+        "nodes": sum(stats["nodes"] for stats in pages.values()),
+        "phases_ms": phases,
+    }
+    slowest = sorted(pages, key=lambda rel_path: pages[rel_path]["total_ms"], reverse=True)[:top]
+    return {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pages": pages,
+        "totals": totals,
+        "slowest": [{"page": rel_path, "total_ms": pages[rel_path]["total_ms"]} for rel_path in slowest],
+    }
+
+
+def compare_reports(baseline, report, threshold=DEFAULT_THRESHOLD):
+    # returns one entry per page and metric that grew past threshold
+    if baseline is None:
+        return []
+    regressions = []
+    for rel_path, stats in sorted(report["pages"].items()):
+        old = baseline["pages"].get(rel_path)
+        if old is None or stats.get("skipped"):
+            continue
+        for metric in ["total_ms", "output_bytes"]:
+            old_value = old[metric]
+            new_value = stats[metric]
+            if metric == "total_ms" and new_value < MIN_COMPARE_MS:
+                continue
+            if old_value > 0 and new_value > old_value * (1 + threshold):
+                regressions.append(
+                    {
+                        "page": rel_path,
+                        "metric": metric,
+                        "old": old_value,
+                        "new": new_value,
+                        "ratio": new_value / old_value,
+                    }
+                )
+    return regressions
+
+
+def load_report(path):
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        report = json.load(f)
+    if report.get("version") != REPORT_VERSION:
+        return None
+    return report
+
+
+def save_report(path, report):
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def print_report(report, path):
+    totals = report["totals"]
+    total_ms = totals["phases_ms"].get("page", 0.0)
+    print(
+        f"Build report: {totals['rendered']} pages rendered in {total_ms:.1f} ms, "
+        f"{totals['input_bytes']} bytes in, {totals['output_bytes']} bytes out -> {path}"
+    )
+    for entry in report["slowest"]:
+        print(f" * {entry['total_ms']:8.2f} ms {entry['page']}")
+    for regression in report["regressions"]:
+        print(
+            f" ! {regression['page']}: {regression['metric']} grew "
+            f"{regression['old']:.6g} -> {regression['new']:.6g} ({regression['ratio']:.2f}x)"
+        )
@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+NO_SPAN = nullcontext()
+
+
+class Tracer:
+    # Collects complete ("X") events in the Chrome trace-event format.
+    # perf_counter_ns is the system-wide monotonic clock on Linux, so events
+    # recorded in pool workers line up with the main process.
+    def __init__(self):
+        self.events = []
+
+    @contextmanager
+    def span(self, name, **args):
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start_ns, time.perf_counter_ns(), args)
+
+    def add(self, name, start_ns, end_ns, args=None):
+        event = {
+            "name": name,
+            "cat": "build",
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+
+def span(tracer, name, **args):
+    # a shared no-op context when tracing is off
+    if tracer is None:
+        return NO_SPAN
+    return tracer.span(name, **args)
+
+
+def save_trace(path, events):
+    main_pid = os.getpid()
+    pids = sorted({event["pid"] for event in events})
+    metadata = []
+    worker = 0
+    for pid in pids:
+        if pid == main_pid:
+            name = "build"
+        else:
+            worker += 1
+            name = f"worker {worker}"
+        metadata.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
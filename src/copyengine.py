@@ -0,0 +1,121 @@
+import errno
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+COPY_MODES = ["copy", "hardlink", "reflink"]
+FICLONE = 0x40049409
+CHUNK_SIZE = 8 * 1024 * 1024
+# errors meaning "this kernel or filesystem can't do that", not a real failure
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY, errno.EPERM}
+
+
+def default_workers():
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+def copy_files(pairs, mode="copy", workers=None):
+    # pairs: [(from_path, dest_path)]; returns the bytes written
+    if mode not in COPY_MODES:
+        raise ValueError(f"unknown copy mode: {mode}")
+    if workers is None:
+        workers = default_workers()
+    for dest_dir_path in {os.path.dirname(dest_path) for _, dest_path in pairs}:
+        if dest_dir_path != "":
+            os.makedirs(dest_dir_path, exist_ok=True)
+    if workers <= 1 or len(pairs) <= 1:
+        return sum(copy_one(from_path, dest_path, mode) for from_path, dest_path in pairs)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(copy_one, from_path, dest_path, mode) for from_path, dest_path in pairs]
+        return sum(future.result() for future in futures)
+
+
+def copy_one(from_path, dest_path, mode="copy"):
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        if mode == "hardlink" and try_hardlink(from_path, tmp_path):
+            pass
+        elif mode == "reflink" and try_reflink(from_path, tmp_path):
+            shutil.copystat(from_path, tmp_path)
+        else:
+            kernel_copy(from_path, tmp_path)
+            shutil.copystat(from_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.stat(dest_path).st_size
+
+
+def try_hardlink(from_path, tmp_path):
+    try:
+        os.link(from_path, tmp_path)
+    except OSError as e:
+        if e.errno in UNSUPPORTED_ERRNOS:
+            return False
+        raise
+    return True
+
+
+def try_reflink(from_path, tmp_path):
+    if fcntl is None:
+        return False
+    with open(from_path, "rb") as src, open(tmp_path, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError as e:
+            if e.errno in UNSUPPORTED_ERRNOS:
+                return False
+            raise
+    return True
+
+
+def kernel_copy(from_path, dest_path):
+    # copy_file_range, then sendfile, keep the bytes inside the kernel;
+    # plain buffered copying is the last resort
+    with open(from_path, "rb") as src, open(dest_path, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        if size == 0:
+            return
+        for copy in [copy_with_copy_file_range, copy_with_sendfile]:
+            try:
+                if copy(src.fileno(), dst.fileno(), size):
+                    return
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+
+def copy_with_copy_file_range(src_fd, dst_fd, size):
+    if not hasattr(os, "copy_file_range"):
+        return False
+    offset = 0
+    while offset < size:
+        sent = os.copy_file_range(src_fd, dst_fd, min(CHUNK_SIZE, size - offset), offset, offset)
+        if sent == 0:
+            break
+        offset += sent
+    return offset == size
+
+
+def copy_with_sendfile(src_fd, dst_fd, size):
+    if not hasattr(os, "sendfile"):
+        return False
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, min(CHUNK_SIZE, size - offset))
+        if sent == 0:
+            break
+        offset += sent
+    return offset == size
@@ -1,16 +1,110 @@
+import json
 import os
-import shutil
 
+from copyengine import copy_files
+from outputsync import dest_state_path, same_file
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
+
+DEFAULT_STATIC_STATE_DIR = "./.cache/static-manifests"
+
+
+def copy_files_recursive(
+    source_dir_path,
+    dest_dir_path,
+    use_hash=False,
+    mode="copy",
+    workers=None,
+    assets=None,
+    exclude=None,
+    state_dir_path=DEFAULT_STATIC_STATE_DIR,
+):
+    # Copies only files whose size and mtime (or content hash) differ from the
+    # destination and removes files a previous run copied whose source is gone.
+    # Files are copied by copyengine in a thread pool; mode picks plain
+    # copying, hardlinks or reflinks. With an AssetManifest, files are copied
+    # under their fingerprinted names. Source rel paths in exclude are skipped,
+    # and removed when an earlier run copied them. The list of copied files
+    # is kept under state_dir_path, one file per destination, so nothing but
+    # the site ends up in the output tree.
+    # Returns {"outputs": [(dest_path, changed)], "removed": [...], ...}.
     if not os.path.exists(dest_dir_path):
-        os.mkdir(dest_dir_path)
-
-    for filename in os.listdir(source_dir_path):
-        from_path = os.path.join(source_dir_path, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        print(f" * {from_path} -> {dest_path}")
-        if os.path.isfile(from_path):
-            shutil.copy(from_path, dest_path)
+        os.makedirs(dest_dir_path)
+
+    outputs = []
+    to_copy = []
+    rel_paths = []
+    for rel_path in collect_files(source_dir_path):
+        if exclude and rel_path in exclude:
+            continue
+        from_path = os.path.join(source_dir_path, rel_path)
+        if assets is not None:
+            rel_path = assets.names[rel_path.replace(os.sep, "/")]
+        dest_path = os.path.join(dest_dir_path, rel_path)
+        rel_paths.append(rel_path)
+        if is_up_to_date(from_path, dest_path, use_hash):
+            outputs.append((dest_path, False))
+            continue
+        to_copy.append((from_path, dest_path))
+        outputs.append((dest_path, True))
+    copied = len(to_copy)
+    copied_bytes = copy_files(to_copy, mode, workers)
+
+    manifest_path = dest_state_path(state_dir_path, dest_dir_path)
+    removed = []
+    current = set(rel_paths)
+    for rel_path in load_static_manifest(manifest_path):
+        dest_path = os.path.join(dest_dir_path, rel_path)
+        if rel_path not in current and os.path.isfile(dest_path):
+            os.remove(dest_path)
+            removed.append(dest_path)
+    save_static_manifest(manifest_path, rel_paths)
+
+    print(
+        f"Static files: {copied} copied ({format_bytes(copied_bytes)}), "
+        f"{len(outputs) - copied} unchanged, {len(removed)} removed"
+    )
+    return {"outputs": outputs, "removed": removed, "copied": copied, "copied_bytes": copied_bytes}
+
+
+def collect_files(source_dir_path, rel_dir_path=""):
+    rel_paths = []
+    for filename in sorted(os.listdir(os.path.join(source_dir_path, rel_dir_path))):
+        rel_path = os.path.join(rel_dir_path, filename)
+        if os.path.isfile(os.path.join(source_dir_path, rel_path)):
+            rel_paths.append(rel_path)
         else:
-            copy_files_recursive(from_path, dest_path)
+            rel_paths.extend(collect_files(source_dir_path, rel_path))
+    return rel_paths
+
+
+def is_up_to_date(from_path, dest_path, use_hash=False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    from_stat = os.stat(from_path)
+    if from_stat.st_size != dest_stat.st_size:
+        return False
+    if use_hash:
+        return same_file(from_path, dest_path)
+    return int(from_stat.st_mtime) == int(dest_stat.st_mtime)
+
+
+def load_static_manifest(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_static_manifest(path, rel_paths):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(rel_paths, f, indent=2)
+
+
+def format_bytes(size):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
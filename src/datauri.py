@@ -0,0 +1,89 @@
+import base64
+import hashlib
+import json
+import os
+
+from copystatic import collect_files
+from extract_markdown_images import extract_markdown_images
+
+
+DEFAULT_INLINE_BYTES = 2048
+INLINE_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+    ".ico": "image/x-icon",
+}
+# static files searched for references to inlined images
+TEXT_EXTENSIONS = {".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".webmanifest"}
+
+
+class InlineAssets:
+    def __init__(self, uris):
+        # uris: {root-relative url path: data uri}
+        self.uris = uris
+        self.digest = hashlib.sha256(json.dumps(uris, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def data_uri(self, url):
+        # only the exact path; a query or fragment asks for the file itself
+        return self.uris.get(url)
+
+
+def build_inline_assets(static_dir_path, max_bytes=DEFAULT_INLINE_BYTES):
+    # Encodes the static images of at most max_bytes. Files with the same
+    # bytes share one encoding, so each is encoded once per build however
+    # many pages or paths use it.
+    encodings = {}
+    uris = {}
+    for rel_path in collect_files(static_dir_path):
+        media_type = INLINE_TYPES.get(os.path.splitext(rel_path)[1].lower())
+        path = os.path.join(static_dir_path, rel_path)
+        if media_type is None or os.path.getsize(path) > max_bytes:
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        key = (media_type, hashlib.sha256(data).hexdigest())
+        uri = encodings.get(key)
+        if uri is None:
+            uri = f"data:{media_type};base64,{base64.b64encode(data).decode('ascii')}"
+            encodings[key] = uri
+        uris["/" + rel_path.replace(os.sep, "/")] = uri
+    print(f"Inlining {len(uris)} images of at most {max_bytes} bytes ({len(encodings)} distinct)")
+    return InlineAssets(uris)
+
+
+def unreferenced_assets(inline, static_dir_path, content_dir_path, template_path):
+    # Returns the static rel paths of inlined images that pages use and that
+    # nothing but inlined markdown images refers to, so the static copy can
+    # skip them. Any other mention of the file name, in the template, a text
+    # static file or the markdown (links, relative paths, code), keeps it.
+    names = {url: url.rsplit("/", 1)[1] for url in inline.uris}
+    mentions = dict.fromkeys(inline.uris, 0)
+    inlined = dict.fromkeys(inline.uris, 0)
+
+    def count(text):
+        for url, name in names.items():
+            mentions[url] += text.count(name)
+
+    with open(template_path, "r") as f:
+        count(f.read())
+    for rel_path in collect_files(static_dir_path):
+        if os.path.splitext(rel_path)[1].lower() in TEXT_EXTENSIONS:
+            with open(os.path.join(static_dir_path, rel_path), "r", errors="replace") as f:
+                count(f.read())
+    for rel_path in collect_files(content_dir_path):
+        with open(os.path.join(content_dir_path, rel_path), "r", errors="replace") as f:
+            text = f.read()
+        count(text)
+        for _, url in extract_markdown_images(text):
+            if url in inlined:
+                inlined[url] += 1
+
+    unreferenced = set()
+    for url in inline.uris:
+        if inlined[url] and mentions[url] <= inlined[url]:
+            unreferenced.add(url[1:].replace("/", os.sep))
+    return unreferenced
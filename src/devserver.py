@@ -0,0 +1,254 @@
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from copyengine import copy_one
+from copystatic import DEFAULT_STATIC_STATE_DIR, copy_files_recursive
+from gencontent import PageBuildError, collect_pages, is_page_source, page_parts, remove_empty_dirs
+from outputsync import sync_bytes
+from template import load_template
+from urls import url_resolver
+
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + RELOAD_PATH + "\").onmessage = function () { location.reload(); };</script>"
+)
+
+
+class PollingWatcher:
+    def __init__(self, paths):
+        # paths may be files or directories; directories are watched recursively
+        self.paths = paths
+        self.stamps = self.snapshot()
+
+    def snapshot(self):
+        stamps = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                scan_dir(path, stamps)
+            elif os.path.exists(path):
+                stat = os.stat(path)
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def poll(self):
+        # returns (changed, removed) paths since the previous poll; new files
+        # count as changed
+        stamps = self.snapshot()
+        changed = sorted(path for path, stamp in stamps.items() if self.stamps.get(path) != stamp)
+        removed = sorted(path for path in self.stamps if path not in stamps)
+        self.stamps = stamps
+        return changed, removed
+
+
+def scan_dir(dir_path, stamps):
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                scan_dir(entry.path, stamps)
+            else:
+                stat = entry.stat()
+                stamps[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+
+class SiteState:
+    def __init__(
+        self,
+        content_dir_path,
+        static_dir_path,
+        template_path,
+        dest_dir_path,
+        basepath="/",
+        static_state_dir_path=DEFAULT_STATIC_STATE_DIR,
+    ):
+        # Keeps every page's title and rendered content in memory, so an edit
+        # re-renders one page and a template change only re-wraps the pages.
+        self.content_dir_path = content_dir_path
+        self.static_dir_path = static_dir_path
+        self.template_path = template_path
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath
+        self.static_state_dir_path = static_state_dir_path
+        self.pages = {}
+
+    def build(self):
+        copy_files_recursive(
+            self.static_dir_path, self.dest_dir_path, use_hash=True, state_dir_path=self.static_state_dir_path
+        )
+        self.pages = {}
+        for from_path, dest_path in collect_pages(self.content_dir_path, self.dest_dir_path):
+            self.render_page(from_path, dest_path)
+        return self.write_pages(list(self.pages))
+
+    def watched_paths(self):
+        return [self.content_dir_path, self.static_dir_path, self.template_path]
+
+    def apply(self, changed, removed):
+        # returns the output paths whose bytes changed or that were removed
+        outputs = []
+        if self.template_path in changed:
+            outputs.extend(self.write_pages(list(self.pages)))
+        for path in changed:
+            if is_inside(path, self.content_dir_path):
+                if not is_page_source(path):
+                    continue
+                dest_path = self.page_dest_path(path)
+                self.render_page(path, dest_path)
+                outputs.extend(self.write_pages([path]))
+            elif is_inside(path, self.static_dir_path):
+                dest_path = os.path.join(self.dest_dir_path, os.path.relpath(path, self.static_dir_path))
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                copy_one(path, dest_path)
+                outputs.append(dest_path)
+        for path in removed:
+            if is_inside(path, self.content_dir_path):
+                if not is_page_source(path):
+                    continue
+                self.pages.pop(path, None)
+                outputs.append(self.remove_output(self.page_dest_path(path)))
+            elif is_inside(path, self.static_dir_path):
+                rel_path = os.path.relpath(path, self.static_dir_path)
+                outputs.append(self.remove_output(os.path.join(self.dest_dir_path, rel_path)))
+        return [path for path in outputs if path is not None]
+
+    def page_dest_path(self, from_path):
+        rel_path = os.path.relpath(from_path, self.content_dir_path)
+        return str(Path(self.dest_dir_path, rel_path).with_suffix(".html"))
+
+    def render_page(self, from_path, dest_path):
+        try:
+            with open(from_path, "r") as f:
+                markdown_content = f.read()
+            title, content = page_parts(markdown_content, url_resolver(self.basepath))
+            content = "".join(content)
+        except Exception as e:
+            raise PageBuildError(from_path, e) from e
+        self.pages[from_path] = {"dest_path": str(dest_path), "title": title, "content": content}
+
+    def write_pages(self, from_paths):
+        template = load_template(self.template_path, self.basepath)
+        written = []
+        for from_path in from_paths:
+            page = self.pages[from_path]
+            html = template.render(Title=page["title"], Content=page["content"])
+            if sync_bytes(page["dest_path"], html.encode("utf-8")):
+                written.append(page["dest_path"])
+        return written
+
+    def remove_output(self, dest_path):
+        if not os.path.exists(dest_path):
+            return None
+        os.remove(dest_path)
+        remove_empty_dirs(os.path.dirname(dest_path), self.dest_dir_path)
+        return dest_path
+
+
+def is_inside(path, dir_path):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(dir_path)]) == os.path.abspath(dir_path)
+
+
+class ReloadHub:
+    # browsers wait on the version; every rebuild bumps it and wakes them
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class ReloadHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, hub=None, **kwargs):
+        self.hub = hub
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            self.stream_reloads()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, "rb") as f:
+            body = inject_reload_script(f.read())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        version = self.hub.version
+        try:
+            while True:
+                new_version = self.hub.wait(version, timeout=15)
+                if new_version == version:
+                    # keep-alive comment so dead connections get noticed
+                    self.wfile.write(b": ping\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def inject_reload_script(body):
+    script = RELOAD_SCRIPT.encode("utf-8")
+    index = body.rfind(b"</body>")
+    if index == -1:
+        return body + script
+    return body[:index] + script + body[index:]
+
+
+def start_server(dest_dir_path, port, hub):
+    handler = partial(ReloadHandler, directory=dest_dir_path, hub=hub)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def watch(site, hub=None, interval=0.05):
+    watcher = PollingWatcher(site.watched_paths())
+    while True:
+        time.sleep(interval)
+        changed, removed = watcher.poll()
+        if not changed and not removed:
+            continue
+        start = time.perf_counter()
+        try:
+            outputs = site.apply(changed, removed)
+        except (PageBuildError, OSError, UnicodeDecodeError) as e:
+            # e.g. a file removed or half written between the poll and the build
+            print(f"Build error: {e}")
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        for path in outputs:
+            print(f" * {path}")
+        print(f"Rebuilt {len(outputs)} outputs in {elapsed:.1f} ms")
+        if outputs and hub is not None:
+            hub.notify()
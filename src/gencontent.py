@@ -1,43 +1,449 @@
+import copy
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from markdown_to_html_node import markdown_to_html_node
+from block_cache import open_block_cache
+from buildreport import write_build_report
+from buildtrace import Tracer, span
+from markdown_to_html_node import blocks_to_html_node, iter_block_nodes
+from manifest import hash_file, load_manifest, page_key, save_manifest
+from minify import minify_chunks, minify_html
+from outputsync import same_file, sync_bytes
+from scan_blocks import scan_blocks
+from template import load_template
+from urls import LinkRecorder, url_resolver
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for filename in os.listdir(dir_path_content):
+# basepath used to render a page once for several targets; pages whose text
+# contains the mark are rendered once per target instead
+SPLICE_MARK = "\0"
+SPLICE_BASEPATH = SPLICE_MARK + "/"
+
+# the PageOptions of a pool worker, set once by its initializer
+_worker_options = None
+
+
+class PageBuildError(Exception):
+    def __init__(self, from_path, error):
+        super().__init__(f"{from_path}: {error}")
+        self.from_path = from_path
+        self.error = error
+
+
+class PageOptions:
+    def __init__(
+        self,
+        block_cache_path=None,
+        sync=False,
+        trace=False,
+        report=False,
+        stream_bytes=None,
+        links=False,
+        assets=None,
+        minify=False,
+        images=None,
+        inline=None,
+    ):
+        # block_cache_path: reuse rendered blocks through a BlockCache file
+        # sync: render in memory and only rewrite outputs whose bytes changed
+        # trace: return per-stage timing events in result["trace"]
+        # report: return sizes, counts and phase times in result["stats"]
+        # stream_bytes: stream sources at least this large block by block
+        # links: return the href/src urls the page emits in result["links"]
+        # assets: an AssetManifest; static urls resolve to fingerprinted names
+        # minify: strip insignificant whitespace and quotes from the html
+        # images: an ImageIndex; local images get width, height and lazy loading
+        # inline: InlineAssets; small local images become data uris
+        self.block_cache_path = block_cache_path
+        self.sync = sync
+        self.trace = trace
+        self.report = report
+        self.stream_bytes = stream_bytes
+        self.links = links
+        self.assets = assets
+        self.minify = minify
+        self.images = images
+        self.inline = inline
+
+
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath,
+    manifest_path=None,
+    jobs=1,
+    options=None,
+    report=None,
+):
+    # report: a ReportOptions; writes a per-page build report when given
+    if report is not None:
+        options = copy.copy(options) if options is not None else PageOptions()
+        options.report = True
+    pages = collect_pages(dir_path_content, dest_dir_path)
+    if manifest_path is None:
+        results = render_pages(pages, template_path, basepath, jobs, options)
+    else:
+        results = generate_pages_incremental(
+            pages, template_path, dest_dir_path, basepath, manifest_path, jobs, options
+        )
+    if report is not None:
+        write_build_report(report, results, dest_dir_path)
+    return results
+
+
+def collect_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for filename in sorted(os.listdir(dir_path_content)):
         from_path = os.path.join(dir_path_content, filename)
         dest_path = os.path.join(dest_dir_path, filename)
-        if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path, basepath)
+        if os.path.isdir(from_path):
+            pages.extend(collect_pages(from_path, dest_path))
+        elif is_page_source(from_path):
+            pages.append((from_path, Path(dest_path).with_suffix(".html")))
+    return pages
+
+
+def is_page_source(path):
+    # other files in the content directory, such as images or editor
+    # backups, are not pages
+    return path.endswith(".md")
+
+
+def render_pages(pages, template_path, basepath, jobs=1, options=None):
+    if options is None:
+        options = PageOptions()
+    calls = [(from_path, dest_path, (from_path, template_path, dest_path, basepath)) for from_path, dest_path in pages]
+    results = run_pages(generate_page, calls, template_path, jobs, options)
+    print_block_cache_totals(results, options)
+    return results
+
+
+def generate_targets(dir_path_content, template_path, targets, jobs=1, options=None):
+    # targets: [(dest_dir_path, basepath)]; every page is parsed and rendered
+    # once and written to each target
+    if options is None:
+        options = PageOptions()
+    page_targets = {}
+    for dest_dir_path, basepath in targets:
+        for from_path, dest_path in collect_pages(dir_path_content, dest_dir_path):
+            page_targets.setdefault(from_path, []).append((dest_path, basepath))
+    calls = [
+        (from_path, ", ".join(str(dest_path) for dest_path, _ in page), (from_path, template_path, page))
+        for from_path, page in page_targets.items()
+    ]
+    results = []
+    for page_results in run_pages(generate_page_targets, calls, template_path, jobs, options):
+        results.extend(page_results)
+    print_block_cache_totals(results, options)
+    return results
+
+
+def run_pages(func, calls, template_path, jobs=1, options=None):
+    # calls: [(from_path, dest label, args)]; runs func(*args, options) for
+    # each page, in a process pool when jobs > 1, and returns the results in
+    # page order. The options, with their asset manifest, image index and
+    # data uris, are sent to each worker once rather than with every page.
+    results = []
+    if jobs <= 1 or len(calls) <= 1:
+        for from_path, dest_label, args in calls:
+            print(f" * {from_path} {template_path} -> {dest_label}")
+            try:
+                results.append(func(*args, options))
+            except Exception as e:
+                raise PageBuildError(from_path, e) from e
+        return results
+
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=set_worker_options, initargs=(options,))
+    try:
+        futures = [executor.submit(call_with_worker_options, func, *args) for _, _, args in calls]
+        for (from_path, dest_label, _), future in zip(calls, futures):
+            print(f" * {from_path} {template_path} -> {dest_label}")
+            try:
+                results.append(future.result())
+            except Exception as e:
+                raise PageBuildError(from_path, e) from e
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def set_worker_options(options):
+    global _worker_options
+    _worker_options = options
+
+
+def call_with_worker_options(func, *args):
+    return func(*args, _worker_options)
+
+
+def print_block_cache_totals(results, options):
+    if options.block_cache_path is None:
+        return
+    totals = {"hits": 0, "disk_hits": 0, "misses": 0}
+    for result in results:
+        for name, count in result.get("block_cache", {}).items():
+            totals[name] += count
+    print(
+        f"Block cache: {totals['hits']} memory hits, {totals['disk_hits']} disk hits, "
+        f"{totals['misses']} misses"
+    )
+
+
+def generate_pages_incremental(
+    pages, template_path, dest_dir_path, basepath, manifest_path, jobs=1, options=None
+):
+    if options is None:
+        options = PageOptions()
+    manifest = load_manifest(manifest_path)
+    old_pages = manifest["pages"]
+    new_pages = {}
+    template_hash = hash_file(template_path)
+    # fingerprinted asset names, image data and minification end up in the html
+    context = url_resolver(basepath, options.assets, options.images, options.inline).context
+    if options.minify:
+        context += "\0minify"
+    to_render = []
+    skipped = []
+    for from_path, dest_path in pages:
+        rel_path = os.path.relpath(dest_path, dest_dir_path)
+        key = page_key(hash_file(from_path), template_hash, context)
+        entry = old_pages.get(rel_path)
+        if entry is not None and entry["key"] == key and os.path.exists(dest_path):
+            skipped.append({"dest_path": str(dest_path), "changed": False})
         else:
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+            to_render.append((from_path, dest_path))
+        new_pages[rel_path] = {"source": from_path, "key": key}
+    results = render_pages(to_render, template_path, basepath, jobs, options)
 
+    removed = []
+    for rel_path in old_pages:
+        if rel_path in new_pages:
+            continue
+        dest_path = os.path.join(dest_dir_path, rel_path)
+        if os.path.exists(dest_path):
+            print(f" * removing {dest_path}")
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
+            removed.append({"dest_path": dest_path, "changed": True, "removed": True})
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f" * {from_path} {template_path} -> {dest_path}")
-    from_file = open(from_path, "r")
-    markdown_content = from_file.read()
-    from_file.close()
+    manifest["pages"] = new_pages
+    save_manifest(manifest_path, manifest)
+    print(f"Rebuilt {len(to_render)} pages, skipped {len(skipped)} unchanged, removed {len(removed)} stale")
+    return results + skipped + removed
+
+
+def remove_empty_dirs(dir_path, stop_dir_path):
+    stop_dir_path = os.path.abspath(stop_dir_path)
+    dir_path = os.path.abspath(dir_path)
+    while dir_path != stop_dir_path and dir_path.startswith(stop_dir_path):
+        if os.listdir(dir_path):
+            return
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+
+def generate_page(from_path, template_path, dest_path, basepath, options=None):
+    if options is None:
+        options = PageOptions()
+    tracer = Tracer() if options.trace or options.report else None
+    stats = {"source": str(from_path)} if options.report else None
+    start_ns = time.perf_counter_ns()
+
+    template = load_template(template_path, basepath, options.assets)
+    resolver = url_resolver(basepath, options.assets, options.images, options.inline)
+    if options.links:
+        resolver = LinkRecorder(resolver)
+
+    block_cache = None
+    if options.block_cache_path is not None:
+        block_cache = open_block_cache(options.block_cache_path)
+        counters_before = block_cache.counters()
+
+    result = {"dest_path": str(dest_path), "changed": True}
+    input_bytes = os.path.getsize(from_path)
+    if options.stream_bytes is not None and input_bytes >= options.stream_bytes:
+        result["changed"] = stream_page(
+            from_path, dest_path, template, resolver, block_cache, tracer, stats, options.sync, options.minify
+        )
+    else:
+        with span(tracer, "read"):
+            from_file = open(from_path, "r")
+            markdown_content = from_file.read()
+            from_file.close()
+        input_bytes = len(markdown_content.encode("utf-8"))
+
+        title, content = page_parts(markdown_content, resolver, block_cache, tracer, stats)
+
+        if tracer is None:
+            chunks = template.iter_chunks(Title=title, Content=content)
+            if options.minify:
+                chunks = minify_chunks(chunks)
+        else:
+            # rendering and template filling normally stream straight into the
+            # output file; materialize them so each stage gets its own span
+            with tracer.span("render"):
+                content = "".join(content)
+            with tracer.span("template"):
+                chunks = [template.render(Title=title, Content=content)]
+            if options.minify:
+                with tracer.span("minify"):
+                    chunks = [minify_html(chunks[0])]
+
+        with span(tracer, "write"):
+            if options.sync:
+                result["changed"] = sync_bytes(dest_path, "".join(chunks).encode("utf-8"))
+            else:
+                write_page(dest_path, chunks)
+
+    if block_cache is not None:
+        block_cache.flush()
+        counters = block_cache.counters()
+        result["block_cache"] = {name: counters[name] - counters_before[name] for name in counters}
+    if tracer is not None:
+        tracer.add("page", start_ns, time.perf_counter_ns(), {"path": str(from_path)})
+    if options.trace:
+        result["trace"] = tracer.events
+    if options.links:
+        result["links"] = resolver.urls
+        result["source"] = str(from_path)
+    if stats is not None:
+        stats["input_bytes"] = input_bytes
+        stats["output_bytes"] = os.path.getsize(dest_path)
+        stats["phases_ms"] = {event["name"]: event["dur"] / 1000 for event in tracer.events}
+        result["stats"] = stats
+    return result
+
+
+def generate_page_targets(from_path, template_path, targets, options=None):
+    # Renders the page once with every root-relative url marked by
+    # SPLICE_BASEPATH, then writes each (dest_path, basepath) target by
+    # joining the pieces between the marks with that target's prefix.
+    # Sources at or above options.stream_bytes are streamed once per target
+    # instead, so they are never held in memory.
+    if options is None:
+        options = PageOptions()
+    if options.stream_bytes is not None and os.path.getsize(from_path) >= options.stream_bytes:
+        return [generate_page(from_path, template_path, dest_path, basepath, options) for dest_path, basepath in targets]
+    with open(from_path, "r") as from_file:
+        markdown_content = from_file.read()
+    template = load_template(template_path, SPLICE_BASEPATH, options.assets)
+    plain_template = load_template(template_path, "/")
+    if SPLICE_MARK in markdown_content or any(SPLICE_MARK in segment for segment in plain_template.segments):
+        # the mark can't be told apart from the page's own text
+        return [generate_page(from_path, template_path, dest_path, basepath, options) for dest_path, basepath in targets]
+
+    block_cache = None
+    if options.block_cache_path is not None:
+        block_cache = open_block_cache(options.block_cache_path)
+        counters_before = block_cache.counters()
+    resolver = url_resolver(SPLICE_BASEPATH, options.assets, options.images, options.inline)
+    title, content = page_parts(markdown_content, resolver, block_cache)
+    pieces = template.render(Title=title, Content="".join(content)).split(SPLICE_BASEPATH)
+
+    results = []
+    for dest_path, basepath in targets:
+        html = url_resolver(basepath).prefix.join(pieces)
+        if options.minify:
+            # after joining, since the prefix decides which values need quotes
+            html = minify_html(html)
+        result = {"dest_path": str(dest_path), "changed": True}
+        if options.sync:
+            result["changed"] = sync_bytes(dest_path, html.encode("utf-8"))
+        else:
+            write_page(dest_path, [html])
+        results.append(result)
+    if block_cache is not None:
+        block_cache.flush()
+        counters = block_cache.counters()
+        results[0]["block_cache"] = {name: counters[name] - counters_before[name] for name in counters}
+    return results
+
+
+def stream_page(
+    from_path, dest_path, template, resolver, block_cache=None, tracer=None, stats=None, sync=False, minify=False
+):
+    # Reads, parses and renders one block at a time straight into the output
+    # file, so memory is bounded by the largest block, not the document.
+    # Returns whether the output changed.
+    with span(tracer, "title"):
+        title = find_title(from_path)
+    if stats is not None:
+        stats["blocks"] = 0
+        stats["nodes"] = 1
+    with open(from_path, "r") as from_file:
+        content = stream_content(iter_lines(from_file), resolver, block_cache, stats)
+        chunks = template.iter_chunks(Title=title, Content=content)
+        if minify:
+            chunks = minify_chunks(chunks)
+        with span(tracer, "stream"):
+            return write_page(dest_path, chunks, sync)
+
+
+def stream_content(lines, resolver, block_cache=None, stats=None):
+    # the same chunks as markdown_to_html_node(...).iter_html()
+    yield "<div>"
+    for node in iter_block_nodes(scan_blocks(lines), block_cache, resolver):
+        if stats is not None:
+            stats["blocks"] += 1
+            stats["nodes"] += node.node_count()
+        yield from node.iter_html()
+    yield "</div>"
+
+
+def iter_lines(from_file):
+    # the same lines as from_file.read().split("\n"), one at a time
+    line = ""
+    for line in from_file:
+        yield line[:-1] if line.endswith("\n") else line
+    if line == "" or line.endswith("\n"):
+        yield ""
+
+
+def find_title(from_path):
+    # extract_title without reading the whole file
+    with open(from_path, "r") as from_file:
+        for line in iter_lines(from_file):
+            if line.startswith("# "):
+                return line[2:]
+    raise ValueError("no title found")
 
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
+def page_parts(markdown_content, resolver, block_cache=None, tracer=None, stats=None):
+    # returns the page title and its content as a lazy iterable of html chunks;
+    # stats, when given, receives the block and node counts
+    blocks = scan_blocks(markdown_content.split("\n"))
+    if tracer is not None or stats is not None:
+        with span(tracer, "parse.blocks"):
+            blocks = list(blocks)
+    with span(tracer, "parse.inline"):
+        node = blocks_to_html_node(blocks, block_cache, resolver)
+    if stats is not None:
+        stats["blocks"] = len(blocks)
+        stats["nodes"] = node.node_count()
+    return extract_title(markdown_content), node.iter_html()
 
-    title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-    template = template.replace('href="/', 'href="' + basepath)
-    template = template.replace('src="/', 'src="' + basepath)
 
+def write_page(dest_path, chunks, sync=False):
+    # with sync, an output whose bytes did not change is left untouched;
+    # returns whether the output changed
     dest_dir_path = os.path.dirname(dest_path)
     if dest_dir_path != "":
         os.makedirs(dest_dir_path, exist_ok=True)
-    to_file = open(dest_path, "w")
-    to_file.write(template)
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as to_file:
+            to_file.writelines(chunks)
+        if sync and same_file(tmp_path, dest_path):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
 
 
 def extract_title(md):
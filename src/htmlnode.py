@@ -1,4 +1,8 @@
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+    # how many nodes this one counts as in node_count
+    source_nodes = 1
+
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
         self.value = value
@@ -8,13 +12,42 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError
 
+    def html_parts(self):
+        # (opening chunk, children, closing chunk) for the iterative serializer
+        raise NotImplementedError
+
+    def iter_html(self):
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                yield item
+                continue
+            start, children, end = item.html_parts()
+            yield start
+            if children:
+                stack.append(end)
+                stack.extend(reversed(children))
+            elif end:
+                yield end
+
+    def node_count(self):
+        count = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            count += node.source_nodes
+            if node.children:
+                stack.extend(node.children)
+        return count
+
+    def write_to(self, fileobj):
+        fileobj.writelines(self.iter_html())
+
     def props_to_html(self):
         if self.props is None:
             return ""
-        props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
-        return props_html
+        return "".join([f' {prop}="{value}"' for prop, value in self.props.items()])
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
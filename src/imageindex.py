@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import struct
+
+from copystatic import collect_files
+from statcache import StatCache
+
+
+DEFAULT_IMAGE_CACHE_PATH = "./.cache/image-sizes.json"
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+HEADER_BYTES = 32
+# JPEG segments walked before giving up on finding the frame header
+MAX_JPEG_SEGMENTS = 256
+# EXIF orientations that rotate the image by 90 or 270 degrees
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+JPEG_FRAME_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+
+class ImageIndex:
+    def __init__(self, sizes):
+        # sizes: {root-relative url path: [width, height]}
+        self.sizes = sizes
+        self.digest = hashlib.sha256(json.dumps(sizes, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def attributes(self, url):
+        # extra img attributes for a url as written in the markdown
+        size = self.sizes.get(url.split("#", 1)[0].split("?", 1)[0])
+        if size is None:
+            return {}
+        return {"width": str(size[0]), "height": str(size[1]), "loading": "lazy", "decoding": "async"}
+
+
+def build_image_index(static_dir_path, cache_path=DEFAULT_IMAGE_CACHE_PATH):
+    cache = StatCache(cache_path)
+    sizes = {}
+    for rel_path in collect_files(static_dir_path):
+        if os.path.splitext(rel_path)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        size = cache.get(os.path.join(static_dir_path, rel_path), image_size)
+        if size is not None:
+            sizes["/" + rel_path.replace(os.sep, "/")] = size
+    cache.save()
+    print(f"Image index: {len(sizes)} images, {cache.computed} read, {cache.reused} unchanged")
+    return ImageIndex(sizes)
+
+
+def image_size(path):
+    # Returns [width, height] from the file's header, or None for formats
+    # and files it can't read. Only the header is read, never the pixels.
+    with open(path, "rb") as f:
+        header = f.read(HEADER_BYTES)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR" and len(header) >= 24:
+            return list(struct.unpack(">II", header[16:24]))
+        if header[:6] in (b"GIF87a", b"GIF89a") and len(header) >= 10:
+            return list(struct.unpack("<HH", header[6:10]))
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return webp_size(header)
+        if header[:2] == b"\xff\xd8":
+            f.seek(2)
+            return jpeg_size(f)
+    return None
+
+
+def webp_size(header):
+    chunk = header[12:16]
+    if len(header) < 30 and not (chunk == b"VP8L" and len(header) >= 25):
+        return None
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return [width & 0x3FFF, height & 0x3FFF]
+    if chunk == b"VP8L" and header[20] == 0x2F:
+        bits = int.from_bytes(header[21:25], "little")
+        return [(bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1]
+    if chunk == b"VP8X":
+        return [int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1]
+    return None
+
+
+def jpeg_size(f):
+    # walks the segment headers, seeking over their bodies, up to the frame
+    # header; APP1 is read for the EXIF orientation
+    rotated = False
+    for _ in range(MAX_JPEG_SEGMENTS):
+        byte = f.read(1)
+        if byte != b"\xff":
+            return None
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if marker == b"":
+            return None
+        marker = marker[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) != 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if length < 2:
+            return None
+        if marker in JPEG_FRAME_MARKERS:
+            frame = f.read(5)
+            if len(frame) != 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return [height, width] if rotated else [width, height]
+        if marker == 0xE1:
+            body = f.read(length - 2)
+            rotated = exif_orientation(body) in ROTATED_ORIENTATIONS
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+def exif_orientation(body):
+    # the Orientation tag of IFD0 in an APP1 "Exif" segment, or None
+    if not body.startswith(b"Exif\0\0") or len(body) < 14:
+        return None
+    tiff = body[6:]
+    byte_order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if byte_order is None:
+        return None
+    offset = struct.unpack(byte_order + "I", tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(byte_order + "H", tiff[offset : offset + 2])[0]
+    for i in range(count):
+        entry = offset + 2 + i * 12
+        if entry + 12 > len(tiff):
+            return None
+        tag, _, _, value = struct.unpack(byte_order + "HHIH", tiff[entry : entry + 10])
+        if tag == 0x0112:
+            return value
+    return None
@@ -2,6 +2,8 @@ from htmlnode import HTMLNode
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props = None):
         super().__init__(tag, value, None, props)
 
@@ -13,3 +15,6 @@ class LeafNode(HTMLNode):
         if self.tag == "img":
             return f"<{self.tag}{self.props_to_html()}>"
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+    def html_parts(self):
+        return self.to_html(), None, None
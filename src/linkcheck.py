@@ -0,0 +1,192 @@
+import json
+import os
+import posixpath
+import re
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from manifest import GENERATOR_VERSION
+from outputsync import dest_state_path
+from template import load_template
+from urls import URL_ATTRIBUTE_RE, url_resolver
+
+
+DEFAULT_LINKS_STATE_DIR = "./.cache/link-manifests"
+SCHEME_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*:")
+CHUNK_PAGES = 256
+
+_worker_index = None
+
+
+def check_site_links(
+    dest_dir_path,
+    basepath,
+    static,
+    results,
+    template_path=None,
+    jobs=1,
+    incremental=False,
+    assets=None,
+    state_dir_path=DEFAULT_LINKS_STATE_DIR,
+):
+    # Checks every link the pages emitted against the set of output paths.
+    # static: copy_files_recursive's result; results: the page results,
+    # built with PageOptions(links=True). With incremental, only pages that
+    # were re-rendered or that link to an added or removed output are
+    # checked again; the rest keep their findings from the links manifest.
+    # Returns [(source, url)] for every broken link.
+    prefix = url_resolver(basepath).prefix
+    manifest_path = dest_state_path(state_dir_path, dest_dir_path)
+    old = load_links_manifest(manifest_path, prefix) if incremental else None
+
+    outputs = [dest_path for dest_path, _ in static["outputs"]]
+    outputs.extend(result["dest_path"] for result in results if not result.get("removed"))
+    index = site_index(dest_dir_path, outputs)
+
+    pages = {}
+    to_check = []
+    unknown = 0
+    for result in results:
+        if result.get("removed"):
+            continue
+        page_rel = output_rel_path(result["dest_path"], dest_dir_path)
+        if "links" in result:
+            pages[page_rel] = {"source": result["source"], "links": result["links"]}
+            to_check.append(page_rel)
+        elif old is not None and page_rel in old["pages"]:
+            pages[page_rel] = old["pages"][page_rel]
+        else:
+            unknown += 1
+    if template_path is not None:
+        pages[""] = {"source": template_path, "links": template_links(template_path, basepath, assets)}
+        to_check.append("")
+
+    if old is not None:
+        changed_paths = index.symmetric_difference(old["index"])
+        checking = set(to_check)
+        for page_rel, page in pages.items():
+            if page_rel in checking or not changed_paths:
+                continue
+            for url in page["links"]:
+                if changed_paths.intersection(link_candidates(url, page_rel, prefix) or ()):
+                    to_check.append(page_rel)
+                    break
+    else:
+        to_check = list(pages)
+
+    checks = [(page_rel, pages[page_rel]["links"]) for page_rel in to_check]
+    for page_rel, broken in check_links(checks, index, prefix, jobs).items():
+        pages[page_rel]["broken"] = broken
+
+    broken_links = []
+    link_count = 0
+    for page_rel in sorted(pages):
+        page = pages[page_rel]
+        link_count += len(page["links"])
+        for url in page.get("broken", []):
+            broken_links.append((page["source"], url))
+            print(f" ! {page['source']}: broken link {url}")
+    print(
+        f"Checked {link_count} links on {len(pages)} pages ({len(to_check)} rechecked): "
+        f"{len(broken_links)} broken"
+    )
+    if unknown:
+        print(f"{unknown} unchanged pages have no recorded links; build once without --incremental to check them")
+
+    pages.pop("", None)
+    manifest = {"version": GENERATOR_VERSION, "prefix": prefix, "index": sorted(index), "pages": pages}
+    save_links_manifest(manifest_path, manifest)
+    return broken_links
+
+
+def site_index(dest_dir_path, output_paths):
+    return {output_rel_path(path, dest_dir_path) for path in output_paths}
+
+
+def output_rel_path(path, dest_dir_path):
+    return os.path.relpath(path, dest_dir_path).replace(os.sep, "/")
+
+
+def template_links(template_path, basepath, assets=None):
+    # root-relative links only; relative ones depend on the page
+    template = load_template(template_path, basepath, assets)
+    links = []
+    for segment in template.segments[::2]:
+        links.extend(match.group(2) for match in URL_ATTRIBUTE_RE.finditer(segment))
+    return [url for url in links if url.startswith("/")]
+
+
+def link_candidates(url, page_rel, prefix):
+    # Returns the output paths that would serve url, [] when it can't be
+    # inside the site, or None for urls that aren't checked (external,
+    # protocol-relative, mailto:, fragment-only).
+    if url == "" or url.startswith("#") or url.startswith("//") or SCHEME_RE.match(url):
+        return None
+    path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+    if path.startswith("/"):
+        if path + "/" == prefix:
+            path = prefix
+        if not path.startswith(prefix):
+            return []
+        rel_path = path[len(prefix) :]
+    else:
+        rel_path = posixpath.join(posixpath.dirname(page_rel), path)
+    directory = rel_path == "" or rel_path.endswith("/")
+    rel_path = posixpath.normpath(rel_path)
+    if rel_path == ".":
+        return ["index.html"]
+    if rel_path.startswith("../") or rel_path == "..":
+        return []
+    if directory:
+        return [rel_path + "/index.html"]
+    return [rel_path, rel_path + "/index.html"]
+
+
+def broken_links(page_rel, urls, index, prefix):
+    broken = []
+    for url in urls:
+        candidates = link_candidates(url, page_rel, prefix)
+        if candidates is None:
+            continue
+        if not any(candidate in index for candidate in candidates):
+            broken.append(url)
+    return broken
+
+
+def check_links(checks, index, prefix, jobs=1):
+    # checks: [(page_rel, urls)]; returns {page_rel: broken urls}
+    if jobs <= 1 or len(checks) <= CHUNK_PAGES:
+        return {page_rel: broken_links(page_rel, urls, index, prefix) for page_rel, urls in checks}
+    chunks = [checks[i : i + CHUNK_PAGES] for i in range(0, len(checks), CHUNK_PAGES)]
+    found = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=set_worker_index, initargs=(index,)) as executor:
+        for chunk_found in executor.map(check_chunk, chunks, [prefix] * len(chunks)):
+            found.update(chunk_found)
+    return found
+
+
+def set_worker_index(index):
+    global _worker_index
+    _worker_index = index
+
+
+def check_chunk(checks, prefix):
+    return {page_rel: broken_links(page_rel, urls, _worker_index, prefix) for page_rel, urls in checks}
+
+
+def load_links_manifest(path, prefix):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != GENERATOR_VERSION or manifest.get("prefix") != prefix:
+        return None
+    return manifest
+
+
+def save_links_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -1,9 +1,28 @@
+import argparse
 import os
 import shutil
 import sys
 
+from assets import fingerprint_assets, remove_asset_manifest, write_asset_manifest
+from block_cache import DEFAULT_CACHE_PATH, open_block_cache
+from buildreport import DEFAULT_THRESHOLD, DEFAULT_TOP, ReportOptions
+from buildtrace import Tracer, save_trace, span
+from copyengine import COPY_MODES
 from copystatic import copy_files_recursive
-from gencontent import generate_pages_recursive
+from datauri import build_inline_assets, unreferenced_assets
+from devserver import ReloadHub, SiteState, start_server, watch
+from gencontent import PageOptions, generate_pages_recursive, generate_targets
+from imageindex import build_image_index
+from linkcheck import check_site_links
+from manifest import MANIFEST_NAME
+from outputsync import remove_orphans, write_changed_list
+from precompress import (
+    DEFAULT_BROTLI_QUALITY,
+    DEFAULT_LEVEL,
+    DEFAULT_MIN_BYTES,
+    precompress_outputs,
+    remove_precompressed,
+)
 
 
 dir_path_static = "./static"
@@ -11,22 +30,399 @@ dir_path_public = "./docs"
 dir_path_content = "./content"
 template_path = "./template.html"
 default_basepath = "/"
+default_port = 8888
+default_stream_bytes = 32 * 1024 * 1024
 
 
-def main():
-    basepath = default_basepath
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into ./docs")
+    parser.add_argument("basepath", nargs="?", default=default_basepath)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="keep ./docs and only re-render pages whose inputs changed",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to render pages",
+    )
+    parser.add_argument(
+        "--block-cache",
+        action="store_true",
+        help=f"reuse rendered blocks across pages and builds ({DEFAULT_CACHE_PATH})",
+    )
+    parser.add_argument(
+        "--static-hash",
+        action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--static-mode",
+        choices=COPY_MODES,
+        default="copy",
+        help="how static files reach ./docs; hardlink and reflink fall back to copying across filesystems",
+    )
+    parser.add_argument(
+        "--static-workers",
+        type=int,
+        default=None,
+        help="threads used to copy static files",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files as name.<hash>.ext, rewrite references to them and write asset-manifest.json",
+    )
+    parser.add_argument(
+        "--image-sizes",
+        action="store_true",
+        help="add width, height, loading=lazy and decoding=async to images of static files, read from their headers",
+    )
+    parser.add_argument(
+        "--inline-images",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="inline images of static files up to this size as data: uris, and skip copying those nothing else uses",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip insignificant whitespace and attribute quotes from pages, keeping <pre> and <code> as written",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (and .br when the brotli module is installed) next to html, css and other text outputs",
+    )
+    parser.add_argument("--compress-level", type=int, default=DEFAULT_LEVEL, help="gzip level, 1-9")
+    parser.add_argument("--brotli-quality", type=int, default=DEFAULT_BROTLI_QUALITY, help="brotli quality, 0-11")
+    parser.add_argument(
+        "--compress-min-bytes",
+        type=int,
+        default=DEFAULT_MIN_BYTES,
+        metavar="BYTES",
+        help="leave outputs smaller than this uncompressed",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="keep ./docs and only rewrite files whose bytes changed, removing orphans",
+    )
+    parser.add_argument(
+        "--changed-list",
+        metavar="PATH",
+        help="with --sync, write the changed and removed output paths as JSON",
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=int,
+        default=default_stream_bytes,
+        metavar="BYTES",
+        help="render markdown files at least this large block by block to bound memory (0 streams every page)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="write a Chrome trace-event JSON of the build, viewable in Perfetto or about:tracing",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="PATH",
+        help="write a per-page build report as JSON and compare it with the previous one",
+    )
+    parser.add_argument(
+        "--report-baseline",
+        metavar="PATH",
+        help="report to compare with instead of the previous one at --report",
+    )
+    parser.add_argument("--report-top", type=int, default=DEFAULT_TOP, help="slowest pages to list")
+    parser.add_argument(
+        "--report-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="flag pages whose render time or output size grew by more than this fraction",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="check that every internal link and image points at a built file; exits 1 on broken links",
+    )
+    parser.add_argument(
+        "--target",
+        nargs=2,
+        action="append",
+        metavar=("DIR", "BASEPATH"),
+        help="build into DIR with BASEPATH instead of ./docs; repeat to render every page once for several targets",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="build, then keep running and re-render only the pages and assets that change",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="like --watch, and serve ./docs with live reload",
+    )
+    parser.add_argument("--port", type=int, default=default_port, help="port used by --serve")
+    args = parser.parse_args(argv)
+    if args.changed_list and not args.sync:
+        parser.error("--changed-list requires --sync")
+    if args.target:
+        unsupported = [
+            flag
+            for flag, value in [
+                ("--incremental", args.incremental),
+                ("--changed-list", args.changed_list),
+                ("--trace", args.trace),
+                ("--report", args.report),
+                ("--check-links", args.check_links),
+                ("--watch", args.watch),
+                ("--serve", args.serve),
+            ]
+            if value
+        ]
+        if unsupported:
+            parser.error(f"--target can't be combined with {', '.join(unsupported)}")
+    if args.watch or args.serve:
+        # the dev server renders and copies in-process, without any of these build options
+        unsupported = [
+            flag
+            for flag, value in [
+                ("--jobs", args.jobs != 1),
+                ("--incremental", args.incremental),
+                ("--sync", args.sync),
+                ("--block-cache", args.block_cache),
+                ("--static-hash", args.static_hash),
+                ("--static-mode", args.static_mode != "copy"),
+                ("--static-workers", args.static_workers),
+                ("--fingerprint", args.fingerprint),
+                ("--image-sizes", args.image_sizes),
+                ("--inline-images", args.inline_images is not None),
+                ("--minify", args.minify),
+                ("--compress", args.compress),
+                ("--trace", args.trace),
+                ("--report", args.report),
+                ("--check-links", args.check_links),
+            ]
+            if value
+        ]
+        if unsupported:
+            mode = "--serve" if args.serve else "--watch"
+            parser.error(f"{mode} can't be combined with {', '.join(unsupported)}")
+    return args
 
-    print("Deleting public directory...")
-    if os.path.exists(dir_path_public):
-        shutil.rmtree(dir_path_public)
+
+def main(argv=None):
+    args = parse_args(argv)
+    basepath = args.basepath
+    if args.watch or args.serve:
+        serve(basepath, args.serve, args.port)
+        return
+    if args.target:
+        build_targets(args)
+        return
+
+    manifest_path = None
+    if args.incremental:
+        manifest_path = os.path.join(dir_path_public, MANIFEST_NAME)
+    if not (args.incremental or args.sync):
+        print("Deleting public directory...")
+        if os.path.exists(dir_path_public):
+            shutil.rmtree(dir_path_public)
+
+    tracer = Tracer() if args.trace is not None else None
+
+    assets = None
+    if args.fingerprint:
+        with span(tracer, "fingerprint"):
+            assets = fingerprint_assets(dir_path_static)
+    images = None
+    if args.image_sizes:
+        with span(tracer, "image index"):
+            images = build_image_index(dir_path_static)
+    inline = None
+    exclude = None
+    if args.inline_images is not None:
+        with span(tracer, "inline images"):
+            inline = build_inline_assets(dir_path_static, args.inline_images)
+            exclude = unreferenced_assets(inline, dir_path_static, dir_path_content, template_path)
 
     print("Copying static files to public directory...")
-    copy_files_recursive(dir_path_static, dir_path_public)
+    with span(tracer, "static copy"):
+        static = copy_files_recursive(
+            dir_path_static,
+            dir_path_public,
+            args.sync or args.static_hash,
+            args.static_mode,
+            args.static_workers,
+            assets,
+            exclude,
+        )
+        if assets is not None:
+            static["outputs"].append(write_asset_manifest(dir_path_public, assets))
+        else:
+            static["removed"].extend(remove_asset_manifest(dir_path_public, static))
+
+    options = PageOptions(
+        sync=args.sync,
+        trace=tracer is not None,
+        stream_bytes=args.stream_threshold,
+        links=args.check_links,
+        assets=assets,
+        minify=args.minify,
+        images=images,
+        inline=inline,
+    )
+    if args.block_cache:
+        options.block_cache_path = DEFAULT_CACHE_PATH
+
+    report = None
+    if args.report is not None:
+        report = ReportOptions(args.report, args.report_baseline, args.report_top, args.report_threshold)
 
     print("Generating content...")
-    generate_pages_recursive(dir_path_content, template_path, dir_path_public, basepath)
+    with span(tracer, "pages", jobs=args.jobs):
+        results = generate_pages_recursive(
+            dir_path_content, template_path, dir_path_public, basepath, manifest_path, args.jobs, options, report
+        )
+    if options.block_cache_path is not None:
+        open_block_cache(options.block_cache_path).evict()
+
+    if args.compress:
+        with span(tracer, "compress", jobs=args.jobs):
+            compress_outputs(args, static, results, dir_path_public)
+    else:
+        static["removed"].extend(remove_precompressed(dir_path_public))
+
+    if args.sync:
+        with span(tracer, "sync outputs"):
+            sync_outputs(static, results, args.changed_list)
+
+    broken_links = []
+    if args.check_links:
+        print("Checking links...")
+        with span(tracer, "check links"):
+            broken_links = check_site_links(
+                dir_path_public, basepath, static, results, template_path, args.jobs, args.incremental, assets
+            )
+
+    if tracer is not None:
+        events = list(tracer.events)
+        for result in results:
+            events.extend(result.get("trace", []))
+        save_trace(args.trace, events)
+        print(f"Wrote {len(events)} trace events to {args.trace}")
+    if broken_links:
+        sys.exit(1)
+
+
+def build_targets(args):
+    targets = [(dest_dir_path, basepath) for dest_dir_path, basepath in args.target]
+    assets = fingerprint_assets(dir_path_static) if args.fingerprint else None
+    images = build_image_index(dir_path_static) if args.image_sizes else None
+    inline = None
+    exclude = None
+    if args.inline_images is not None:
+        inline = build_inline_assets(dir_path_static, args.inline_images)
+        exclude = unreferenced_assets(inline, dir_path_static, dir_path_content, template_path)
+    statics = []
+    for dest_dir_path, _ in targets:
+        if not args.sync:
+            print(f"Deleting {dest_dir_path}...")
+            if os.path.exists(dest_dir_path):
+                shutil.rmtree(dest_dir_path)
+        print(f"Copying static files to {dest_dir_path}...")
+        static = copy_files_recursive(
+            dir_path_static,
+            dest_dir_path,
+            args.sync or args.static_hash,
+            args.static_mode,
+            args.static_workers,
+            assets,
+            exclude,
+        )
+        if assets is not None:
+            static["outputs"].append(write_asset_manifest(dest_dir_path, assets))
+        else:
+            static["removed"].extend(remove_asset_manifest(dest_dir_path, static))
+        statics.append(static)
+
+    options = PageOptions(
+        sync=args.sync,
+        stream_bytes=args.stream_threshold,
+        assets=assets,
+        minify=args.minify,
+        images=images,
+        inline=inline,
+    )
+    if args.block_cache:
+        options.block_cache_path = DEFAULT_CACHE_PATH
+
+    print(f"Generating content for {len(targets)} targets...")
+    results = generate_targets(dir_path_content, template_path, targets, args.jobs, options)
+    if options.block_cache_path is not None:
+        open_block_cache(options.block_cache_path).evict()
+
+    # results come page by page, one per target in target order
+    for i, (dest_dir_path, _) in enumerate(targets):
+        if args.compress:
+            compress_outputs(args, statics[i], results[i :: len(targets)], dest_dir_path)
+        else:
+            statics[i]["removed"].extend(remove_precompressed(dest_dir_path))
+        if args.sync:
+            sync_outputs(statics[i], results[i :: len(targets)], None, dest_dir_path)
+
+
+def serve(basepath, with_server, port):
+    site = SiteState(dir_path_content, dir_path_static, template_path, dir_path_public, basepath)
+    print("Building site...")
+    site.build()
+    hub = None
+    if with_server:
+        hub = ReloadHub()
+        start_server(dir_path_public, port, hub)
+        print(f"Serving {dir_path_public} at http://localhost:{port}/")
+    print("Watching for changes, press Ctrl-C to stop")
+    try:
+        watch(site, hub)
+    except KeyboardInterrupt:
+        pass
+
+
+def compress_outputs(args, static, results, dest_dir_path):
+    # the compressed files join the static outputs, so sync keeps them
+    paths = [path for path, _ in static["outputs"]]
+    paths.extend(result["dest_path"] for result in results if not result.get("removed"))
+    compressed = precompress_outputs(
+        dest_dir_path, paths, args.compress_level, args.brotli_quality, args.compress_min_bytes, args.jobs
+    )
+    static["outputs"].extend(compressed["outputs"])
+    static["removed"].extend(compressed["removed"])
+
+
+def sync_outputs(static, results, changed_list_path, dest_dir_path=dir_path_public):
+    expected = [path for path, _ in static["outputs"]]
+    changed = [path for path, was_changed in static["outputs"] if was_changed]
+    removed = list(static["removed"])
+    for result in results:
+        if result.get("removed"):
+            removed.append(result["dest_path"])
+            continue
+        expected.append(result["dest_path"])
+        if result["changed"]:
+            changed.append(result["dest_path"])
+    removed.extend(remove_orphans(dest_dir_path, expected, keep_names=[MANIFEST_NAME]))
+    for path in removed:
+        print(f" * removed {path}")
+    print(f"Synced {len(expected)} files: {len(changed)} written, {len(removed)} removed")
+    if changed_list_path is not None:
+        write_changed_list(changed_list_path, dest_dir_path, changed, removed)
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import hashlib
+import json
+import os
+
+
+GENERATOR_VERSION = "2"
+MANIFEST_NAME = ".build-manifest.json"
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def page_key(content_hash, template_hash, basepath):
+    parts = [GENERATOR_VERSION, content_hash, template_hash, basepath]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"version": GENERATOR_VERSION, "pages": {}}
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != GENERATOR_VERSION:
+        return {"version": GENERATOR_VERSION, "pages": {}}
+    return manifest
+
+
+def save_manifest(path, manifest):
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
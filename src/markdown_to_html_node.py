@@ -1,58 +1,98 @@
 import textwrap
-from markdown_to_blocks import markdown_to_blocks
+from leafnode import LeafNode
 from parentnode import ParentNode
 from block_type import BlockType
 from block_to_block_type import block_to_block_type
+from scan_blocks import scan_blocks
 from text_to_textnodes import text_to_textnodes
 from text_node_to_html_node import text_node_to_html_node
 from textnode import TextNode, TextType
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
-    return ParentNode("div", children, None)
+class CachedBlockNode(LeafNode):
+    # a block's html from the block cache, counted as the nodes it was
+    # rendered from
+    __slots__ = ("source_nodes",)
+
+    def __init__(self, html, source_nodes):
+        super().__init__(None, html)
+        self.source_nodes = source_nodes
+
+
+def markdown_to_html_node(markdown, block_cache=None, resolver=None):
+    # resolver: a UrlResolver for link and image urls
+    return blocks_to_html_node(scan_blocks(markdown.split("\n")), block_cache, resolver)
+
+
+def blocks_to_html_node(blocks, block_cache=None, resolver=None):
+    # blocks: (block_type, lines) pairs from scan_blocks
+    return ParentNode("div", list(iter_block_nodes(blocks, block_cache, resolver)), None)
+
+
+def iter_block_nodes(blocks, block_cache=None, resolver=None):
+    # one html node per block, built only when the caller asks for it
+    for block_type, lines in blocks:
+        if block_cache is None:
+            yield block_lines_to_html_node(block_type, lines, resolver)
+        else:
+            yield cached_block_to_html_node(block_type, lines, block_cache, resolver)
+
+
+def cached_block_to_html_node(block_type, lines, block_cache, resolver=None):
+    # resolved urls end up in the html, so the resolver context is part of the key
+    key = block_cache.key(lines, resolver.context if resolver is not None else "")
+    entry = block_cache.get(key)
+    if entry is None:
+        # the block's own urls are stored with it, so a hit reports the same
+        # links as rendering it again whichever resolver filled the cache
+        recorder = None if resolver is None else resolver.recorder()
+        node = block_lines_to_html_node(block_type, lines, recorder)
+        entry = (node.to_html(), node.node_count(), () if recorder is None else recorder.urls)
+        block_cache.put(key, *entry)
+    if resolver is not None:
+        resolver.saw_links(entry[2])
+    return CachedBlockNode(entry[0], entry[1])
 
 
 def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+    return block_lines_to_html_node(block_to_block_type(block), block.split("\n"))
+
+
+def block_lines_to_html_node(block_type, lines, resolver=None):
     if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
+        return paragraph_to_html_node(lines, resolver)
     if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(lines, resolver)
     if block_type == BlockType.CODE:
-        return code_to_html_node(block)
+        return code_to_html_node(lines)
     if block_type == BlockType.ORDERED_LIST:
-        return olist_to_html_node(block)
+        return olist_to_html_node(lines, resolver)
     if block_type == BlockType.UNORDERED_LIST:
-        return ulist_to_html_node(block)
+        return ulist_to_html_node(lines, resolver)
     if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
+        return quote_to_html_node(lines, resolver)
     raise ValueError("invalid block type")
 
 
-def text_to_children(text):
+def text_to_children(text, resolver=None):
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, resolver)
         children.append(html_node)
     return children
 
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(lines, resolver=None):
     stripped_lines = [line.strip() for line in lines if line.strip()]
     paragraph = " ".join(stripped_lines)
     if not paragraph:
         paragraph = " "
-    children = text_to_children(paragraph)
+    children = text_to_children(paragraph, resolver)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(lines, resolver=None):
+    block = lines[0] if len(lines) == 1 else "\n".join(lines)
     level = 0
     for char in block:
         if char == "#":
@@ -62,11 +102,12 @@ def heading_to_html_node(block):
     if level + 1 >= len(block):
         raise ValueError(f"invalid heading level: {level}")
     text = block[level + 1 :]
-    children = text_to_children(text)
+    children = text_to_children(text, resolver)
     return ParentNode(f"h{level}", children)
 
 
-def code_to_html_node(block):
+def code_to_html_node(lines):
+    block = "\n".join(lines)
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("invalid code block")
     text = block[4:-3]
@@ -79,33 +120,30 @@ def code_to_html_node(block):
     return ParentNode("pre", [code])
 
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(lines, resolver=None):
     html_items = []
-    for item in items:
+    for item in lines:
         text = item[3:]
-        children = text_to_children(text)
+        children = text_to_children(text, resolver)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(lines, resolver=None):
     html_items = []
-    for item in items:
+    for item in lines:
         text = item[2:]
-        children = text_to_children(text)
+        children = text_to_children(text, resolver)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(lines, resolver=None):
     new_lines = []
     for line in lines:
         if not line.startswith(">"):
             raise ValueError("invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
-    children = text_to_children(content)
+    children = text_to_children(content, resolver)
     return ParentNode("blockquote", children)
@@ -0,0 +1,205 @@
+import re
+
+
+# whitespace next to these tags never renders, so it can be dropped; next to
+# anything else it is collapsed to a single space
+BLOCK_TAGS = set(
+    "!doctype html head body title meta link base address article aside blockquote dd details div dl dt fieldset "
+    "figcaption figure footer form h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section summary table tbody td "
+    "tfoot th thead tr ul".split()
+)
+# content of these is copied untouched up to the matching closing tag
+RAW_TAGS = {"pre", "code", "textarea", "script", "style"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# only ASCII whitespace collapses in html, not e.g. U+00A0
+WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+# text up to the next "<", or a whole tag whose ">" isn't inside quotes
+TOKEN_RE = re.compile(r"[^<]+|<(?:[A-Za-z/]|!(?!--))[^>\"']*(?:(?:\"[^\"]*\"|'[^']*')[^>\"']*)*>")
+# text on one line with bare inline tags and inline code, all of which
+# minify to themselves, so only its spaces need looking at
+INLINE_TAG = r"<(?:/?(?:a|abbr|b|cite|em|i|kbd|mark|q|s|samp|small|span|strong|sub|sup|u|var)|br)>"
+INLINE_CODE = r"<code>(?:[^< \t\n\r\f]| (?! ))*</code>"
+INLINE_RUN_RE = re.compile(rf"(?:[^<\t\n\r\f]+|{INLINE_TAG}|{INLINE_CODE})+")
+TAG_PARTS_RE = re.compile(r"<(/?)([^\s/>]+)(.*?)(/?)>", re.DOTALL)
+ATTRIBUTE_RE = re.compile(r"\s*([^\s\"'>/=]+)(?:\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s\"'=<>`]+))?")
+UNQUOTED_VALUE_RE = re.compile(r"[^ \t\n\r\f\"'=<>`]+")
+RAW_END_RES = {name: re.compile("</" + name, re.IGNORECASE) for name in RAW_TAGS}
+# a "<" with no closing ">" this far on is taken as text
+MAX_TAG_BYTES = 64 * 1024
+TAG_CACHE_SIZE = 4096
+
+_parsed_tags = {}
+
+
+def minify_chunks(chunks):
+    # Minifies an html chunk stream as it goes: only a partial tag or a run
+    # of whitespace is held back between chunks, never the page.
+    minifier = HtmlMinifier()
+    for chunk in chunks:
+        html = minifier.feed(chunk)
+        if html:
+            yield html
+    html = minifier.close()
+    if html:
+        yield html
+
+
+def minify_html(html):
+    return "".join(minify_chunks([html]))
+
+
+class HtmlMinifier:
+    def __init__(self):
+        self.buffer = ""
+        # closing tag pattern while inside a raw element
+        self.raw_end = None
+        self.space = False
+        self.after_block = True
+
+    def feed(self, chunk):
+        out = []
+        buffer = self.buffer + chunk
+        pos = 0
+        while pos < len(buffer):
+            if self.raw_end is not None:
+                match = self.raw_end.search(buffer, pos)
+                if match is None:
+                    # keep enough to recognize a closing tag split across chunks
+                    end = max(pos, len(buffer) - len("</textarea"))
+                    out.append(buffer[pos:end])
+                    pos = end
+                    break
+                out.append(buffer[pos : match.start()])
+                pos = match.start()
+                self.raw_end = None
+            match = INLINE_RUN_RE.match(buffer, pos)
+            if match is not None:
+                self.text(match.group(), out)
+                pos = match.end()
+                continue
+            match = TOKEN_RE.match(buffer, pos)
+            if match is not None:
+                token = match.group()
+                if token[0] == "<":
+                    self.tag(token, out)
+                else:
+                    self.text(token, out)
+                pos = match.end()
+                continue
+            # buffer[pos] is a "<" that doesn't open a complete tag
+            if pos + 1 == len(buffer):
+                break
+            next_char = buffer[pos + 1]
+            if not (next_char.isalpha() or next_char in "/!"):
+                # a literal "<" in text
+                self.text("<", out)
+                pos += 1
+                continue
+            if buffer.startswith("<!--", pos):
+                end = buffer.find("-->", pos + 4)
+                if end == -1:
+                    break
+                self.space_before(False, out)
+                out.append(buffer[pos : end + 3])
+                self.after_block = False
+                pos = end + 3
+                continue
+            if len(buffer) - pos <= MAX_TAG_BYTES:
+                # the tag continues in the next chunk
+                break
+            self.text("<", out)
+            pos += 1
+        self.buffer = buffer[pos:]
+        return "".join(out)
+
+    def close(self):
+        out = []
+        if self.raw_end is not None:
+            out.append(self.buffer)
+        elif self.buffer:
+            # an unterminated tag; pass it through
+            self.space_before(False, out)
+            out.append(self.buffer)
+        self.buffer = ""
+        return "".join(out)
+
+    def text(self, text, out):
+        if "  " in text or "\n" in text or "\t" in text or "\r" in text or "\f" in text:
+            text = WHITESPACE_RE.sub(" ", text)
+        # whitespace is now single spaces
+        if text[0] == " ":
+            self.space = True
+            text = text[1:]
+            if not text:
+                return
+        trailing = text[-1] == " "
+        if trailing:
+            text = text[:-1]
+        self.space_before(False, out)
+        out.append(text)
+        self.space = trailing
+        self.after_block = False
+
+    def space_before(self, block, out):
+        # settles whitespace held back until the next token was known
+        if self.space and not self.after_block and not block:
+            out.append(" ")
+        self.space = False
+
+    def tag(self, tag, out):
+        parsed = _parsed_tags.get(tag)
+        if parsed is None:
+            parsed = parse_tag(tag)
+            if len(_parsed_tags) >= TAG_CACHE_SIZE:
+                _parsed_tags.clear()
+            _parsed_tags[tag] = parsed
+        minified, block, raw_end = parsed
+        self.space_before(block, out)
+        out.append(minified)
+        self.after_block = block
+        if raw_end is not None:
+            self.raw_end = raw_end
+
+
+def parse_tag(tag):
+    # returns (minified tag, whether it's a block tag, raw end pattern)
+    parts = TAG_PARTS_RE.fullmatch(tag)
+    if parts is None:
+        return tag, False, None
+    closing, name, attributes, self_closing = parts.groups()
+    name = name.lower()
+    raw_end = None
+    if not closing and not self_closing and name in RAW_TAGS:
+        raw_end = RAW_END_RES[name]
+    return minify_tag(tag, closing, name, attributes, self_closing), name in BLOCK_TAGS, raw_end
+
+
+def minify_tag(tag, closing, name, attributes, self_closing):
+    # Drops redundant quotes and whitespace inside one tag. Anything the
+    # attribute pattern doesn't fully account for is left as written.
+    if self_closing and attributes and attributes[-1] not in " \t\n\r\f\"'":
+        # "/>" right after an unquoted value may belong to the value
+        return tag
+    minified = []
+    pos = 0
+    for match in ATTRIBUTE_RE.finditer(attributes):
+        if match.start() != pos:
+            return tag
+        pos = match.end()
+        attribute, value = match.groups()
+        if value is None:
+            minified.append(attribute)
+            continue
+        if value[0] in "\"'" and UNQUOTED_VALUE_RE.fullmatch(value, 1, len(value) - 1):
+            value = value[1:-1]
+        minified.append(f"{attribute}={value}")
+    if attributes[pos:].strip():
+        return tag
+    html = "<" + closing + tag[1 + len(closing) : 1 + len(closing) + len(name)]
+    if minified:
+        html += " " + " ".join(minified)
+    if self_closing and name not in VOID_TAGS:
+        # the slash matters in svg; the space keeps it out of an unquoted value
+        html += " /"
+    return html + ">"
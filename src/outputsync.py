@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def same_bytes(dest_path, data):
+    try:
+        if os.stat(dest_path).st_size != len(data):
+            return False
+    except FileNotFoundError:
+        return False
+    return file_digest(dest_path) == hashlib.sha256(data).digest()
+
+
+def same_file(src_path, dest_path):
+    try:
+        if os.stat(src_path).st_size != os.stat(dest_path).st_size:
+            return False
+    except FileNotFoundError:
+        return False
+    return file_digest(src_path) == file_digest(dest_path)
+
+
+def atomic_write(dest_path, data):
+    dest_dir_path = os.path.dirname(dest_path)
+    if dest_dir_path != "":
+        os.makedirs(dest_dir_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir_path or ".", prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def sync_bytes(dest_path, data):
+    # returns True when the file had to be (re)written
+    if same_bytes(dest_path, data):
+        return False
+    atomic_write(dest_path, data)
+    return True
+
+
+def remove_orphans(dest_dir_path, expected_paths, keep_names=()):
+    expected = {os.path.abspath(path) for path in expected_paths}
+    removed = []
+    for dir_path, dir_names, filenames in os.walk(dest_dir_path, topdown=False):
+        for filename in filenames:
+            path = os.path.join(dir_path, filename)
+            if filename in keep_names or os.path.abspath(path) in expected:
+                continue
+            os.remove(path)
+            removed.append(path)
+        if dir_path != dest_dir_path and not os.listdir(dir_path):
+            os.rmdir(dir_path)
+    return sorted(removed)
+
+
+def dest_state_path(state_dir_path, dest_dir_path):
+    # a file under state_dir_path for build state about one output directory,
+    # which stays out of the output tree so it is never published
+    key = hashlib.sha256(os.path.abspath(dest_dir_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(state_dir_path, key + ".json")
+
+
+def write_changed_list(path, dest_dir_path, changed_paths, removed_paths):
+    changes = {
+        "changed": sorted(os.path.relpath(p, dest_dir_path) for p in changed_paths),
+        "removed": sorted(os.path.relpath(p, dest_dir_path) for p in removed_paths),
+    }
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(changes, f, indent=2)
@@ -1,19 +1,20 @@
 from htmlnode import HTMLNode
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props = None):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def html_parts(self):
         if not self.tag:
             raise ValueError("All parent nodes must have tag")
         if not self.children:
             raise ValueError("All parent nodes must have children")
-        html_tag = f"<{self.tag}{self.props_to_html()}>"
-        for child in self.children:
-            html_tag += child.to_html()
-        html_tag += f"</{self.tag}>"
-        return html_tag
+        return f"<{self.tag}{self.props_to_html()}>", self.children, f"</{self.tag}>"
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
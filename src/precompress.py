@@ -0,0 +1,167 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from copystatic import format_bytes
+from outputsync import atomic_write, dest_state_path
+
+
+DEFAULT_COMPRESS_STATE_DIR = "./.cache/compress-manifests"
+# images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map"}
+DEFAULT_LEVEL = 9
+DEFAULT_BROTLI_QUALITY = 11
+DEFAULT_MIN_BYTES = 1024
+
+
+def compressed_paths(path):
+    paths = [path + ".gz"]
+    if brotli is not None:
+        paths.append(path + ".br")
+    return paths
+
+
+def precompress_outputs(
+    dest_dir_path,
+    paths,
+    level=DEFAULT_LEVEL,
+    brotli_quality=DEFAULT_BROTLI_QUALITY,
+    min_bytes=DEFAULT_MIN_BYTES,
+    jobs=1,
+    state_dir_path=DEFAULT_COMPRESS_STATE_DIR,
+):
+    # Writes path.gz (and path.br when brotli is installed) next to every
+    # compressible output of at least min_bytes, in a process pool. Files
+    # whose bytes match the digest recorded last time keep their compressed
+    # siblings. Returns {"outputs": [(path, changed)], ...} for the siblings.
+    start = time.perf_counter()
+    manifest_path = dest_state_path(state_dir_path, dest_dir_path)
+    settings = {"level": level, "brotli_quality": brotli_quality, "brotli": brotli is not None}
+    old = load_compress_manifest(manifest_path, settings)
+
+    tasks = []
+    skipped = 0
+    for path in paths:
+        if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        if os.path.getsize(path) < min_bytes:
+            skipped += 1
+            continue
+        rel_path = os.path.relpath(path, dest_dir_path)
+        tasks.append((path, old.get(rel_path), level, brotli_quality))
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            compressed = list(executor.map(compress_one, tasks, chunksize=16))
+    else:
+        compressed = [compress_one(args) for args in tasks]
+
+    entries = {}
+    outputs = []
+    totals = {"input_bytes": 0, "gzip_bytes": 0, "brotli_bytes": 0, "compressed": 0, "reused": 0}
+    for (path, _, _, _), result in zip(tasks, compressed):
+        entries[os.path.relpath(path, dest_dir_path)] = result["digest"]
+        outputs.extend((sibling, not result["reused"]) for sibling in compressed_paths(path))
+        totals["reused" if result["reused"] else "compressed"] += 1
+        totals["input_bytes"] += result["input_bytes"]
+        totals["gzip_bytes"] += result["gzip_bytes"]
+        totals["brotli_bytes"] += result.get("brotli_bytes", 0)
+
+    removed = remove_siblings(dest_dir_path, [rel_path for rel_path in old if rel_path not in entries])
+    save_compress_manifest(manifest_path, settings, entries)
+
+    totals["seconds"] = time.perf_counter() - start
+    totals["skipped"] = skipped
+    print_compression(totals)
+    return dict(totals, outputs=outputs, removed=removed)
+
+
+def remove_precompressed(dest_dir_path, state_dir_path=DEFAULT_COMPRESS_STATE_DIR):
+    # for builds without compression: removes the siblings an earlier run
+    # wrote, so they can't be served in place of newer pages
+    manifest_path = dest_state_path(state_dir_path, dest_dir_path)
+    if not os.path.exists(manifest_path):
+        return []
+    with open(manifest_path, "r") as f:
+        rel_paths = list(json.load(f)["files"])
+    removed = remove_siblings(dest_dir_path, rel_paths)
+    os.remove(manifest_path)
+    return removed
+
+
+def remove_siblings(dest_dir_path, rel_paths):
+    removed = []
+    for rel_path in rel_paths:
+        for sibling in compressed_paths(os.path.join(dest_dir_path, rel_path)):
+            if os.path.exists(sibling):
+                os.remove(sibling)
+                removed.append(sibling)
+    return removed
+
+
+def compress_one(args):
+    path, old_digest, level, brotli_quality = args
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    siblings = compressed_paths(path)
+    result = {"digest": digest, "input_bytes": len(data), "reused": False}
+    if digest == old_digest and all(os.path.exists(sibling) for sibling in siblings):
+        result["reused"] = True
+        result["gzip_bytes"] = os.path.getsize(siblings[0])
+        if brotli is not None:
+            result["brotli_bytes"] = os.path.getsize(siblings[1])
+        return result
+    # mtime=0 keeps the output identical across builds
+    gzipped = gzip.compress(data, compresslevel=level, mtime=0)
+    atomic_write(siblings[0], gzipped)
+    result["gzip_bytes"] = len(gzipped)
+    if brotli is not None:
+        brotlied = brotli.compress(data, quality=brotli_quality)
+        atomic_write(siblings[1], brotlied)
+        result["brotli_bytes"] = len(brotlied)
+    return result
+
+
+def print_compression(totals):
+    input_bytes = totals["input_bytes"]
+    line = (
+        f"Precompressed {totals['compressed']} files, reused {totals['reused']}, "
+        f"skipped {totals['skipped']} small in {totals['seconds'] * 1000:.1f} ms: "
+        f"{format_bytes(input_bytes)} -> gzip {format_bytes(totals['gzip_bytes'])}"
+    )
+    if input_bytes:
+        line += f" ({totals['gzip_bytes'] / input_bytes:.1%})"
+    if brotli is not None:
+        line += f", brotli {format_bytes(totals['brotli_bytes'])}"
+        if input_bytes:
+            line += f" ({totals['brotli_bytes'] / input_bytes:.1%})"
+    print(line)
+
+
+def load_compress_manifest(path, settings):
+    # returns {rel path: source digest}; with other settings the digests are
+    # dropped so every file is compressed again
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("settings") != settings:
+        return {rel_path: None for rel_path in manifest["files"]}
+    return manifest["files"]
+
+
+def save_compress_manifest(path, settings, entries):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"settings": settings, "files": entries}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
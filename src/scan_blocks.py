@@ -0,0 +1,108 @@
+import re
+from block_type import BlockType
+
+
+HEADING_RE = re.compile(r"#{1,6}\s")
+OLIST_RE = re.compile(r"(\d+)\.\s")
+
+
+# fence states of the block being collected
+NO_LINES, TEXT, FENCE_OPEN, FENCE_CLOSED = range(4)
+
+
+def scan_blocks(lines, fences=True):
+    # Yields (block_type, block_lines) in one forward pass over the document
+    # lines. Blocks end at empty lines like markdown.split("\n\n") did, except
+    # that a code fence keeps going across empty lines until it is closed.
+    block = []
+    fence = NO_LINES
+    for line in lines:
+        if line != "":
+            block.append(line)
+            if fences:
+                fence = next_fence_state(fence, line)
+            continue
+        if not block:
+            continue
+        if fence == FENCE_OPEN:
+            block.append(line)
+            continue
+        result = finish_block(block)
+        if result is not None:
+            yield result
+        block = []
+        fence = NO_LINES
+    if not block:
+        return
+    if fence == FENCE_OPEN and "" in block:
+        # the fence never closed, split it on empty lines after all
+        yield from scan_blocks(block, fences=False)
+        return
+    result = finish_block(block)
+    if result is not None:
+        yield result
+
+
+def next_fence_state(state, line):
+    # A block whose first line opens a fence holds empty lines only while the
+    # fence is open: the next line starting (or ending) with ``` closes it and
+    # a later one starting with ``` opens it again.
+    stripped = line.strip()
+    if state == NO_LINES:
+        if stripped == "":
+            return NO_LINES
+        if not stripped.startswith("```"):
+            return TEXT
+        if len(stripped) >= 6 and stripped.endswith("```"):
+            return FENCE_CLOSED
+        return FENCE_OPEN
+    if state == FENCE_OPEN and (stripped.startswith("```") or stripped.endswith("```")):
+        return FENCE_CLOSED
+    if state == FENCE_CLOSED and stripped.startswith("```"):
+        if len(stripped) >= 6 and stripped.endswith("```"):
+            return FENCE_CLOSED
+        return FENCE_OPEN
+    return state
+
+
+def finish_block(block):
+    # trim like str.strip() on the joined block text
+    start = 0
+    end = len(block)
+    while start < end and block[start].strip() == "":
+        start += 1
+    while end > start and block[end - 1].strip() == "":
+        end -= 1
+    if start == end:
+        return None
+    lines = block[start:end]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines_to_block_type(lines), lines
+
+
+def lines_to_block_type(lines):
+    first = lines[0]
+    if HEADING_RE.match(first) or (len(lines) > 1 and 0 < len(first) <= 6 and first == "#" * len(first)):
+        return BlockType.HEADING
+    if first.startswith("```") and lines[-1].endswith("```"):
+        return BlockType.CODE
+    quote = True
+    unordered = True
+    ordered = True
+    for i, line in enumerate(lines):
+        if quote and not line.startswith(">"):
+            quote = False
+        if unordered and not line.startswith("- "):
+            unordered = False
+        if ordered:
+            match = OLIST_RE.match(line)
+            if not match or int(match.group(1)) != i + 1:
+                ordered = False
+        if not (quote or unordered or ordered):
+            return BlockType.PARAGRAPH
+    if quote:
+        return BlockType.QUOTE
+    if unordered:
+        return BlockType.UNORDERED_LIST
+    return BlockType.ORDERED_LIST
@@ -0,0 +1,89 @@
+import re
+from textnode import TextNode, TextType
+from split_nodes_image import split_nodes_image
+from split_nodes_link import split_nodes_link
+
+
+# One alternation finds every span the split_nodes_* pipeline would produce:
+# "**" pairs across the whole text, "_" pairs between bold spans, "`" pairs
+# between bold and italic spans. Images and links only match when they hold
+# no delimiter characters, otherwise the delimiters win as they did before.
+# The last alternatives catch stray delimiters and brackets (one literal per
+# branch keeps the regex prefix scan fast); runs holding one are handed to the
+# original splitters. Span bodies are written as "plain run, then (lone "*",
+# plain run) repeated" so the engine takes each run in one step.
+INLINE_RE = re.compile(
+    r"\*\*([^*]*(?:\*(?!\*)[^*]*)*)\*\*"
+    r"|_([^_*]*(?:\*(?!\*)[^_*]*)*)_"
+    r"|`([^`_*]*(?:\*(?!\*)[^`_*]*)*)`"
+    r"|!\[([^\[\]*_`]*)\]\(([^\(\)*_`]*)\)"
+    r"|\[(?<!!\[)([^\[\]*_`]*)\]\(([^\[\(\)*_`]*)\)"
+    r"|\*()|_()|`()|\[()"
+)
+TEXT = TextType.TEXT
+BOLD = TextType.BOLD
+ITALIC = TextType.ITALIC
+CODE = TextType.CODE
+LINK = TextType.LINK
+IMAGE = TextType.IMAGE
+
+
+def scan_inline(text):
+    # split() hands back the text before each match followed by the match's
+    # groups, so the loop unpacks tuples instead of querying match objects
+    parts = INLINE_RE.split(text)
+    nodes = []
+    append = nodes.append
+    node = TextNode
+    pending = parts[0]
+    irregular = False
+    groups = iter(parts)
+    next(groups)
+    for bold, italic, code, alt, src, label, href, star, under, tick, _, plain in zip(
+        groups, groups, groups, groups, groups, groups, groups, groups, groups, groups, groups, groups
+    ):
+        if bold is None and italic is None and code is None:
+            if label is None and alt is None:
+                irregular = True
+                stray = "*" if star is not None else "_" if under is not None else "`" if tick is not None else "["
+                pending += stray + plain
+                continue
+            if irregular:
+                # an earlier "[" may open a link that overlaps this one
+                pending += (f"[{label}]({href})" if label is not None else f"![{alt}]({src})") + plain
+                continue
+        if irregular:
+            if pending:
+                scan_plain(pending, nodes)
+            irregular = False
+        elif pending:
+            append(node(pending, TEXT))
+        if bold is not None:
+            if bold:
+                append(node(bold, BOLD))
+        elif italic is not None:
+            if italic:
+                append(node(italic, ITALIC))
+        elif code is not None:
+            if code:
+                append(node(code, CODE))
+        elif label is not None:
+            append(node(label, LINK, href))
+        else:
+            append(node(alt, IMAGE, src))
+        pending = plain
+    if pending:
+        if irregular:
+            scan_plain(pending, nodes)
+        else:
+            append(node(pending, TEXT))
+    return nodes
+
+
+def scan_plain(text, nodes):
+    # a delimiter left between spans never found its closing partner
+    if "**" in text or "_" in text or "`" in text:
+        raise ValueError("invalid markdown, formatted section not closed")
+    # images and links the fast alternation could not take, e.g. with a lone
+    # "*" in their text, go through the original splitters
+    nodes.extend(split_nodes_link(split_nodes_image([TextNode(text, TEXT)])))
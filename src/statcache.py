@@ -0,0 +1,39 @@
+import json
+import os
+
+
+class StatCache:
+    # Values computed from a file's bytes, e.g. its hash or image size, kept
+    # in a JSON file and reused while the file's size and mtime are unchanged.
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.used = {}
+        self.computed = 0
+        self.reused = 0
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+
+    def get(self, path, compute):
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            self.reused += 1
+        else:
+            entry = [stat.st_size, stat.st_mtime_ns, compute(path)]
+            self.computed += 1
+        self.used[path] = entry
+        return entry[2]
+
+    def save(self):
+        # keeps only the files looked up this run, so deleted files drop out
+        if self.path is None:
+            return
+        dir_path = os.path.dirname(self.path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.used, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,69 @@
+import os
+import re
+
+from urls import resolve_attributes, url_resolver
+
+
+PLACEHOLDER_RE = re.compile(r"\{\{ (Title|Content) \}\}")
+
+_compiled_templates = {}
+
+
+class Template:
+    def __init__(self, segments):
+        # literals at even indices, placeholder names at odd indices
+        self.segments = segments
+
+    def render(self, **values):
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            parts[i] = values[parts[i]]
+        return "".join(parts)
+
+    def iter_chunks(self, **values):
+        # values may be strings or chunk iterables; an iterable used by more
+        # than one placeholder is materialized so every slot sees all of it
+        slots = self.segments[1::2]
+        for name, value in values.items():
+            if not isinstance(value, str) and slots.count(name) > 1:
+                values[name] = "".join(value)
+        for i, segment in enumerate(self.segments):
+            if i % 2 == 0:
+                yield segment
+                continue
+            value = values[segment]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def write_to(self, fileobj, **values):
+        fileobj.writelines(self.iter_chunks(**values))
+
+    def __repr__(self):
+        return f"Template({self.segments})"
+
+
+def compile_template(template, basepath, assets=None):
+    resolver = url_resolver(basepath, assets)
+    segments = []
+    last = 0
+    for match in PLACEHOLDER_RE.finditer(template):
+        segments.append(resolve_attributes(template[last : match.start()], resolver))
+        segments.append(match.group(1))
+        last = match.end()
+    segments.append(resolve_attributes(template[last:], resolver))
+    return Template(segments)
+
+
+def load_template(template_path, basepath, assets=None):
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), url_resolver(basepath, assets).context)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _compiled_templates.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(template_path, "r") as f:
+        template = compile_template(f.read(), basepath, assets)
+    _compiled_templates[key] = (stamp, template)
+    return template
@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+
+from assets import (
+    ASSET_MANIFEST_NAME,
+    AssetManifest,
+    fingerprint_assets,
+    fingerprint_name,
+    remove_asset_manifest,
+    write_asset_manifest,
+)
+from copystatic import copy_files_recursive
+from manifest import hash_file
+from statcache import StatCache
+from template import load_template
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.state = os.path.join(self.tmp.name, "cache", "static")
+        self.cache_path = os.path.join(self.tmp.name, "cache", "hashes.json")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("images/a.png", "0123456789abcdef"), "images/a.0123456789.png")
+        self.assertEqual(fingerprint_name("CNAME", "0123456789abcdef"), "CNAME.0123456789")
+
+    def test_names_follow_content(self):
+        first = fingerprint_assets(self.src, self.cache_path)
+        self.assertEqual(sorted(first.names), ["images/a.png", "index.css"])
+        self.write(os.path.join(self.src, "index.css"), "body { margin: 0 }")
+        second = fingerprint_assets(self.src, self.cache_path)
+        self.assertNotEqual(first.names["index.css"], second.names["index.css"])
+        self.assertEqual(first.names["images/a.png"], second.names["images/a.png"])
+        self.assertNotEqual(first.digest, second.digest)
+
+    def test_hash_cache_skips_unchanged_files(self):
+        fingerprint_assets(self.src, self.cache_path)
+        cache = StatCache(self.cache_path)
+        cache.get(os.path.join(self.src, "index.css"), hash_file)
+        self.assertEqual((cache.computed, cache.reused), (0, 1))
+        path = os.path.join(self.src, "images", "a.png")
+        self.write(path, "new png")
+        cache.get(path, hash_file)
+        self.assertEqual((cache.computed, cache.reused), (1, 1))
+
+    def test_hash_cache_drops_deleted_files(self):
+        fingerprint_assets(self.src, self.cache_path)
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        fingerprint_assets(self.src, self.cache_path)
+        with open(self.cache_path) as f:
+            self.assertEqual(list(json.load(f)), [os.path.join(self.src, "index.css")])
+
+    def test_copy_under_fingerprinted_names(self):
+        assets = fingerprint_assets(self.src, self.cache_path)
+        copy_files_recursive(self.src, self.dest, state_dir_path=self.state, assets=assets)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, assets.names["images/a.png"])))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+        # the old fingerprint is removed once the content changes
+        old_css = os.path.join(self.dest, assets.names["index.css"])
+        self.write(os.path.join(self.src, "index.css"), "body { margin: 0 }")
+        assets = fingerprint_assets(self.src, self.cache_path)
+        result = copy_files_recursive(self.src, self.dest, state_dir_path=self.state, assets=assets)
+        self.assertEqual(result["removed"], [old_css])
+
+    def test_write_asset_manifest(self):
+        assets = AssetManifest({"index.css": "index.0123456789.css"})
+        os.makedirs(self.dest)
+        path, changed = write_asset_manifest(self.dest, assets)
+        self.assertEqual(path, os.path.join(self.dest, ASSET_MANIFEST_NAME))
+        self.assertTrue(changed)
+        with open(path) as f:
+            self.assertEqual(json.load(f), assets.names)
+        self.assertFalse(write_asset_manifest(self.dest, assets)[1])
+
+    def test_unfingerprinted_build_removes_fingerprint_outputs(self):
+        assets = fingerprint_assets(self.src, self.cache_path)
+        static = copy_files_recursive(self.src, self.dest, state_dir_path=self.state, assets=assets)
+        manifest_path, _ = write_asset_manifest(self.dest, assets)
+        static = copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        self.assertEqual(remove_asset_manifest(self.dest, static), [manifest_path])
+        self.assertEqual(sorted(static["removed"]), sorted(os.path.join(self.dest, n) for n in assets.names.values()))
+        self.assertEqual(sorted(os.listdir(self.dest)), ["images", "index.css"])
+
+        # a static file of the same name is kept
+        self.write(os.path.join(self.src, ASSET_MANIFEST_NAME), "{}")
+        static = copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        self.assertEqual(remove_asset_manifest(self.dest, static), [])
+        self.assertTrue(os.path.exists(manifest_path))
+
+    def test_template_references_rewritten(self):
+        template_path = os.path.join(self.tmp.name, "template.html")
+        self.write(template_path, '<link href="/index.css"><a href="/about">{{ Content }}</a>')
+        assets = AssetManifest({"index.css": "index.0123456789.css"})
+        template = load_template(template_path, "/site/", assets)
+        self.assertEqual(template.segments[0], '<link href="/site/index.0123456789.css"><a href="/site/about">')
+        plain = load_template(template_path, "/site/")
+        self.assertEqual(plain.segments[0], '<link href="/site/index.css"><a href="/site/about">')
+
+
+if __name__ == "__main__":
+    unittest.main()
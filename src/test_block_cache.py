@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+from datauri import InlineAssets
+from markdown_to_html_node import markdown_to_html_node
+from urls import LinkRecorder, UrlResolver
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_cached_render_matches(self):
+        md = "# Title\n\nSome **bold** text\n\n- a\n- b\n\nSome **bold** text"
+        cache = BlockCache()
+        expected = markdown_to_html_node(md).to_html()
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual(cache.counters(), {"hits": 1, "disk_hits": 0, "misses": 3})
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual(cache.counters(), {"hits": 5, "disk_hits": 0, "misses": 3})
+
+    def test_memory_lru_eviction(self):
+        cache = BlockCache(memory_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        self.assertEqual(cache.get("a"), ("12345", 1, ()))
+        cache.put("c", "12345")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ("12345", 1, ()))
+        self.assertEqual(cache.get("c"), ("12345", 1, ()))
+
+    def test_disk_layer_persists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "blocks.sqlite")
+            cache = BlockCache(path)
+            key = cache.key(["Some **bold** text"])
+            cache.put(key, "<p>Some <b>bold</b> text</p>", 4)
+            cache.close()
+
+            cache = BlockCache(path)
+            self.assertEqual(cache.get(key), ("<p>Some <b>bold</b> text</p>", 4, ()))
+            self.assertEqual(cache.counters(), {"hits": 0, "disk_hits": 1, "misses": 0})
+            cache.close()
+
+    def test_disk_eviction_by_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = BlockCache(os.path.join(tmp, "blocks.sqlite"), disk_bytes=10)
+            cache.put("old", "12345")
+            cache.put("mid", "12345")
+            cache.put("new", "12345")
+            cache.flush()
+            for used, key in enumerate(["old", "mid", "new"]):
+                cache.db.execute("UPDATE blocks SET used = ? WHERE key = ?", (used, key))
+            self.assertEqual(cache.evict(), 1)
+            cache.memory.clear()
+            self.assertIsNone(cache.get("old"))
+            self.assertEqual(cache.get("new"), ("12345", 1, ()))
+            cache.close()
+
+    def test_writes_wait_for_flush(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.sqlite")
+            cache = BlockCache(path)
+            cache.put("a", "<p>a</p>")
+            cache.flush()
+            cache.memory.clear()
+            self.assertEqual(cache.get("a"), ("<p>a</p>", 1, ()))
+            cache.put("b", "<p>b</p>")
+            # a disk hit and a miss lock nothing until the page is flushed
+            other = sqlite3.connect(path, timeout=0)
+            with other:
+                other.execute(
+                    "INSERT INTO blocks (key, html, nodes, links, size, used) VALUES ('c', '<p>c</p>', 2, '[]', 8, 0)"
+                )
+            cache.flush()
+            self.assertEqual(other.execute("SELECT html FROM blocks WHERE key = 'b'").fetchone(), ("<p>b</p>",))
+            other.close()
+            cache.close()
+
+    def test_node_count_matches_uncached(self):
+        md = "# Title\n\nSome **bold** [link](/a) text\n\n- a\n- *b*\n\n```\ncode\n```"
+        expected = markdown_to_html_node(md).node_count()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.sqlite")
+            cache = BlockCache(path)
+            self.assertEqual(markdown_to_html_node(md, cache).node_count(), expected)
+            self.assertEqual(markdown_to_html_node(md, cache).node_count(), expected)
+            cache.close()
+            cache = BlockCache(path)
+            self.assertEqual(markdown_to_html_node(md, cache).node_count(), expected)
+            self.assertEqual(cache.counters()["disk_hits"], 4)
+            cache.close()
+
+    def test_hits_record_the_same_links(self):
+        md = (
+            "# [Home](/)\n\nSee `<a href=\"/x\">` and [b](/b) ![dot](/dot.png)\n\n"
+            "- [c](c.html)\n\n```\n<a href=\"/code\">\n```"
+        )
+        resolver = UrlResolver("/site/", inline=InlineAssets({"/dot.png": "data:image/png;base64,AA=="}))
+        uncached = LinkRecorder(resolver)
+        markdown_to_html_node(md, resolver=uncached)
+        self.assertEqual(uncached.urls, ["/site/", "/site/b", "c.html"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.sqlite")
+            cache = BlockCache(path)
+            # filled without recording, then hit from memory and from disk
+            markdown_to_html_node(md, cache, resolver)
+            hit = LinkRecorder(resolver)
+            markdown_to_html_node(md, cache, hit)
+            cache.close()
+            cache = BlockCache(path)
+            disk_hit = LinkRecorder(resolver)
+            markdown_to_html_node(md, cache, disk_hit)
+            self.assertEqual(cache.counters()["disk_hits"], 4)
+            cache.close()
+        self.assertEqual(hit.urls, uncached.urls)
+        self.assertEqual(disk_hit.urls, uncached.urls)
+
+    def test_key_depends_on_context(self):
+        cache = BlockCache()
+        self.assertNotEqual(cache.key(["a"]), cache.key(["a"], "/base/"))
+        self.assertEqual(cache.key(["a", "b"]), cache.key(["a", "b"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
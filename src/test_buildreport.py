@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+
+from buildreport import ReportOptions, build_report, compare_reports, load_report, write_build_report
+
+
+def page_result(dest_path, total_ms, output_bytes=100):
+    return {
+        "dest_path": dest_path,
+        "changed": True,
+        "stats": {
+            "source": dest_path.replace(".html", ".md"),
+            "input_bytes": 50,
+            "output_bytes": output_bytes,
+            "blocks": 2,
+            "nodes": 5,
+            "phases_ms": {"parse.inline": total_ms / 2, "page": total_ms},
+        },
+    }
+
+
+class TestBuildReport(unittest.TestCase):
+    def test_totals_and_slowest(self):
+        results = [
+            page_result("docs/a.html", 2.0),
+            page_result("docs/b.html", 5.0),
+            page_result("docs/c.html", 1.0),
+            {"dest_path": "docs/old.html", "changed": True, "removed": True},
+        ]
+        report = build_report(results, "docs", top=2)
+        self.assertEqual(sorted(report["pages"]), ["a.html", "b.html", "c.html"])
+        self.assertEqual(report["totals"]["output_bytes"], 300)
+        self.assertEqual(report["totals"]["nodes"], 15)
+        self.assertEqual(report["totals"]["phases_ms"], {"parse.inline": 4.0, "page": 8.0})
+        self.assertEqual([entry["page"] for entry in report["slowest"]], ["b.html", "a.html"])
+
+    def test_skipped_pages_keep_baseline_entry(self):
+        baseline = build_report([page_result("docs/a.html", 2.0)], "docs")
+        report = build_report([{"dest_path": "docs/a.html", "changed": False}], "docs", baseline)
+        self.assertTrue(report["pages"]["a.html"]["skipped"])
+        self.assertEqual(report["totals"]["rendered"], 0)
+        self.assertEqual(report["totals"]["skipped"], 1)
+
+    def test_compare_flags_growth(self):
+        baseline = build_report(
+            [page_result("docs/a.html", 2.0), page_result("docs/b.html", 2.0), page_result("docs/c.html", 0.1)],
+            "docs",
+        )
+        report = build_report(
+            [
+                page_result("docs/a.html", 2.2),
+                page_result("docs/b.html", 2.0, output_bytes=200),
+                page_result("docs/c.html", 0.5),
+                page_result("docs/d.html", 9.0),
+            ],
+            "docs",
+        )
+        regressions = compare_reports(baseline, report, threshold=0.25)
+        self.assertEqual([(r["page"], r["metric"]) for r in regressions], [("b.html", "output_bytes")])
+        self.assertEqual(regressions[0]["ratio"], 2.0)
+        self.assertEqual(len(compare_reports(baseline, report, threshold=0.05)), 2)
+        self.assertEqual(compare_reports(None, report), [])
+
+    def test_write_compares_with_previous(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            options = ReportOptions(os.path.join(tmp, "report.json"))
+            write_build_report(options, [page_result(os.path.join(tmp, "a.html"), 2.0)], tmp)
+            report = write_build_report(options, [page_result(os.path.join(tmp, "a.html"), 4.0)], tmp)
+            self.assertEqual(report["regressions"][0]["metric"], "total_ms")
+            self.assertEqual(load_report(options.path)["regressions"], report["regressions"])
+
+    def test_load_ignores_other_versions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            with open(path, "w") as f:
+                json.dump({"version": "0", "pages": {}}, f)
+            self.assertIsNone(load_report(path))
+            self.assertIsNone(load_report(os.path.join(tmp, "missing.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+from buildtrace import NO_SPAN, Tracer, save_trace, span
+
+
+class TestTracer(unittest.TestCase):
+    def test_span_records_complete_event(self):
+        tracer = Tracer()
+        with tracer.span("parse", path="index.md"):
+            pass
+        self.assertEqual(len(tracer.events), 1)
+        event = tracer.events[0]
+        self.assertEqual(event["name"], "parse")
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["pid"], os.getpid())
+        self.assertEqual(event["args"], {"path": "index.md"})
+        self.assertGreaterEqual(event["dur"], 0)
+
+    def test_span_records_on_error(self):
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("write"):
+                raise ValueError("boom")
+        self.assertEqual(tracer.events[0]["name"], "write")
+
+    def test_disabled_span(self):
+        self.assertIs(span(None, "read"), NO_SPAN)
+        with span(None, "read"):
+            pass
+
+    def test_save_trace(self):
+        tracer = Tracer()
+        tracer.add("page", 1_000, 3_000)
+        worker_event = dict(tracer.events[0], pid=os.getpid() + 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out", "trace.json")
+            save_trace(path, tracer.events + [worker_event])
+            with open(path) as f:
+                trace = json.load(f)
+        names = [event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"]
+        self.assertEqual(names, ["build", "worker 1"])
+        self.assertEqual(trace["traceEvents"][2]["ts"], 1.0)
+        self.assertEqual(trace["traceEvents"][2]["dur"], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from copyengine import COPY_MODES, copy_files, kernel_copy
+
+
+class TestCopyEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pairs = []
+        for i, size in enumerate([0, 10, 100_000]):
+            src = os.path.join(self.tmp.name, "src", f"file{i}.bin")
+            os.makedirs(os.path.dirname(src), exist_ok=True)
+            with open(src, "wb") as f:
+                f.write(os.urandom(size))
+            os.utime(src, (1_000_000, 1_000_000))
+            self.pairs.append((src, os.path.join(self.tmp.name, "dest", "nested", f"file{i}.bin")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_modes_copy_bytes_and_mtime(self):
+        for mode in COPY_MODES:
+            written = copy_files(self.pairs, mode, workers=2)
+            self.assertEqual(written, 100_010)
+            for src, dest in self.pairs:
+                self.assertEqual(self.read(src), self.read(dest), mode)
+                self.assertEqual(os.stat(dest).st_mtime, 1_000_000, mode)
+
+    def test_hardlink_shares_inode(self):
+        copy_files(self.pairs, "hardlink")
+        src, dest = self.pairs[1]
+        self.assertTrue(os.path.samefile(src, dest))
+
+    def test_kernel_copy(self):
+        src, dest = self.pairs[2]
+        os.makedirs(os.path.dirname(dest))
+        kernel_copy(src, dest)
+        self.assertEqual(self.read(src), self.read(dest))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            copy_files(self.pairs, "teleport")
+
+
+if __name__ == "__main__":
+    unittest.main()
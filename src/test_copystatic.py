@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from copystatic import copy_files_recursive
+
+
+class TestCopyStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.state = os.path.join(self.tmp.name, "cache", "static")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_copies_then_skips_unchanged(self):
+        first = copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        self.assertEqual(first["copied"], 2)
+        self.assertEqual(first["copied_bytes"], 10)
+        second = copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        self.assertEqual(second["copied"], 0)
+        self.assertEqual([changed for _, changed in second["outputs"]], [False, False])
+
+    def test_copies_modified_file(self):
+        copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        path = os.path.join(self.src, "index.css")
+        self.write(path, "body { margin: 0 }")
+        result = copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        self.assertEqual(result["copied"], 1)
+        with open(os.path.join(self.dest, "index.css")) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
+    def test_hash_mode_detects_same_size_edits(self):
+        copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        path = os.path.join(self.src, "index.css")
+        stat = os.stat(path)
+        self.write(path, "body {{")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(copy_files_recursive(self.src, self.dest, state_dir_path=self.state)["copied"], 0)
+        self.assertEqual(copy_files_recursive(self.src, self.dest, state_dir_path=self.state, use_hash=True)["copied"], 1)
+
+    def test_removes_files_whose_source_is_gone(self):
+        copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<p>page</p>")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        result = copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        self.assertEqual(result["removed"], [os.path.join(self.dest, "images", "a.png")])
+        self.assertTrue(os.path.exists(page))
+
+    def test_manifest_kept_out_of_dest(self):
+        copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        self.assertEqual(sorted(os.listdir(self.dest)), ["images", "index.css"])
+        self.assertEqual(len(os.listdir(self.state)), 1)
+        other = os.path.join(self.tmp.name, "other")
+        copy_files_recursive(self.src, other, state_dir_path=self.state)
+        self.assertEqual(len(os.listdir(self.state)), 2)
+
+    def test_exclude(self):
+        copy_files_recursive(self.src, self.dest, state_dir_path=self.state)
+        excluded = os.path.join("images", "a.png")
+        result = copy_files_recursive(self.src, self.dest, state_dir_path=self.state, exclude={excluded})
+        self.assertEqual([path for path, _ in result["outputs"]], [os.path.join(self.dest, "index.css")])
+        self.assertEqual(result["removed"], [os.path.join(self.dest, excluded)])
+
+
+if __name__ == "__main__":
+    unittest.main()
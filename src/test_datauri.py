@@ -0,0 +1,75 @@
+import base64
+import os
+import tempfile
+import unittest
+
+from datauri import InlineAssets, build_inline_assets, unreferenced_assets
+from text_node_to_html_node import text_node_to_html_node
+from textnode import TextNode, TextType
+from urls import UrlResolver
+
+
+class TestDataUri(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.static, "images"))
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template_path, '<link href="/index.css"><link rel="icon" href="/favicon.png">{{ Content }}')
+        self.write(os.path.join(self.static, "index.css"), "body { background: url(/images/bg.png) }")
+        for name in ["images/a.png", "images/copy.png", "images/bg.png", "images/linked.gif", "favicon.png"]:
+            self.write(os.path.join(self.static, name), "small")
+        self.write(os.path.join(self.static, "images", "big.png"), "x" * 100)
+        self.write(os.path.join(self.static, "images", "notes.txt"), "small")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_build_inline_assets(self):
+        inline = build_inline_assets(self.static, 10)
+        self.assertEqual(
+            sorted(inline.uris),
+            ["/favicon.png", "/images/a.png", "/images/bg.png", "/images/copy.png", "/images/linked.gif"],
+        )
+        encoded = base64.b64encode(b"small").decode("ascii")
+        self.assertEqual(inline.uris["/images/a.png"], "data:image/png;base64," + encoded)
+        self.assertEqual(inline.uris["/images/linked.gif"], "data:image/gif;base64," + encoded)
+        # files with the same bytes and type share one encoded string
+        self.assertIs(inline.uris["/images/a.png"], inline.uris["/images/copy.png"])
+        self.assertNotEqual(build_inline_assets(self.static, 100).digest, inline.digest)
+
+    def test_unreferenced_assets(self):
+        self.write(
+            os.path.join(self.content, "index.md"),
+            "# Home\n\n![a](/images/a.png) ![bg](/images/bg.png) ![fav](/favicon.png)\n",
+        )
+        self.write(
+            os.path.join(self.content, "blog", "post.md"),
+            "# Post\n\n![a again](/images/a.png) ![l](/images/linked.gif) [full size](/images/linked.gif)\n",
+        )
+        inline = build_inline_assets(self.static, 10)
+        excluded = unreferenced_assets(inline, self.static, self.content, self.template_path)
+        # bg.png is used by the css, favicon.png by the template, linked.gif by
+        # a link and copy.png by nothing, so it isn't inlined anywhere either
+        self.assertEqual(excluded, {os.path.join("images", "a.png")})
+
+    def test_image_nodes(self):
+        resolver = UrlResolver("/site/", inline=InlineAssets({"/images/a.png": "data:image/png;base64,AA=="}))
+        node = text_node_to_html_node(TextNode("a", TextType.IMAGE, "/images/a.png"), resolver)
+        self.assertEqual(node.props, {"src": "data:image/png;base64,AA==", "alt": "a"})
+        for url, src in [("/images/a.png?v=2", "/site/images/a.png?v=2"), ("/images/b.png", "/site/images/b.png")]:
+            node = text_node_to_html_node(TextNode("a", TextType.IMAGE, url), resolver)
+            self.assertEqual(node.props["src"], src)
+        link = text_node_to_html_node(TextNode("a", TextType.LINK, "/images/a.png"), resolver)
+        self.assertEqual(link.props["href"], "/site/images/a.png")
+        self.assertNotEqual(resolver.context, UrlResolver("/site/").context)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+from devserver import PollingWatcher, ReloadHub, SiteState, inject_reload_script
+from gencontent import PageBuildError
+
+
+class TestSiteState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n[home](/)")
+        self.write(os.path.join(self.static, "style.css"), "body {}")
+        state = os.path.join(self.tmp.name, "cache")
+        self.site = SiteState(self.content, self.static, self.template, self.dest, "/base/", state)
+        self.site.build()
+        self.watcher = PollingWatcher(self.site.watched_paths())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+        # make sure the stamp moves even on coarse mtime filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def read(self, *parts):
+        with open(os.path.join(self.dest, *parts), "r") as f:
+            return f.read()
+
+    def apply(self):
+        return self.site.apply(*self.watcher.poll())
+
+    def test_build(self):
+        self.assertEqual(self.read("index.html"), "<title>Home</title><div><h1>Home</h1></div>")
+        self.assertIn('href="/base/"', self.read("blog", "post.html"))
+        self.assertEqual(self.read("style.css"), "body {}")
+
+    def test_edit_renders_one_page(self):
+        self.write(os.path.join(self.content, "index.md"), "# Welcome")
+        outputs = self.apply()
+        self.assertEqual(outputs, [os.path.join(self.dest, "index.html")])
+        self.assertEqual(self.read("index.html"), "<title>Welcome</title><div><h1>Welcome</h1></div>")
+
+    def test_no_changes(self):
+        self.assertEqual(self.apply(), [])
+
+    def test_template_change_rewraps_pages(self):
+        self.write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        outputs = self.apply()
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual(self.read("index.html"), "<h2>Home</h2><div><h1>Home</h1></div>")
+
+    def test_added_and_removed_pages(self):
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.write(os.path.join(self.content, "about.md"), "# About")
+        self.apply()
+        self.assertEqual(self.read("about.html"), "<title>About</title><div><h1>About</h1></div>")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_static_change(self):
+        os.remove(os.path.join(self.static, "style.css"))
+        self.write(os.path.join(self.static, "site.css"), "p {}")
+        self.apply()
+        self.assertEqual(self.read("site.css"), "p {}")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "style.css")))
+
+    def test_non_page_files_in_content(self):
+        image = os.path.join(self.content, "blog", "photo.png")
+        with open(image, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n\xff\xfe\x00")
+        self.assertEqual(self.apply(), [])
+        self.site.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "photo.html")))
+        os.remove(image)
+        self.assertEqual(self.apply(), [])
+
+    def test_unreadable_page(self):
+        with open(os.path.join(self.content, "index.md"), "wb") as f:
+            f.write(b"# \xff\xfe")
+        with self.assertRaises(PageBuildError):
+            self.apply()
+        self.assertEqual(self.read("index.html"), "<title>Home</title><div><h1>Home</h1></div>")
+
+
+class TestReload(unittest.TestCase):
+    def test_inject_before_body(self):
+        body = inject_reload_script(b"<html><body>hi</body></html>")
+        self.assertTrue(body.endswith(b"</script></body></html>"))
+        self.assertIn(b"EventSource", body)
+
+    def test_inject_without_body(self):
+        self.assertTrue(inject_reload_script(b"<p>hi</p>").startswith(b"<p>hi</p><script>"))
+
+    def test_hub_wakes_waiters(self):
+        hub = ReloadHub()
+        self.assertEqual(hub.wait(0, timeout=0), 0)
+        hub.notify()
+        self.assertEqual(hub.wait(0, timeout=1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,23 @@
+import json
+import os
+import tempfile
 import unittest
 
-from gencontent import extract_title
+from buildreport import ReportOptions
+from datauri import InlineAssets
+from gencontent import (
+    PageBuildError,
+    PageOptions,
+    extract_title,
+    find_title,
+    generate_page,
+    generate_page_targets,
+    generate_pages_recursive,
+    generate_targets,
+    iter_lines,
+)
+from imageindex import ImageIndex
+from minify import minify_html
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -46,5 +63,274 @@ no title
             pass
 
 
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.manifest = os.path.join(self.dest, ".build-manifest.json")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, basepath="/"):
+        generate_pages_recursive(self.content, self.template, self.dest, basepath, self.manifest)
+
+    def mtime(self, rel_path):
+        return os.stat(os.path.join(self.dest, rel_path)).st_mtime_ns
+
+    def test_skips_unchanged_pages(self):
+        self.build()
+        before = self.mtime("blog/post.html")
+        os.utime(os.path.join(self.dest, "blog/post.html"), ns=(0, 0))
+        self.write(os.path.join(self.content, "index.md"), "# Home again")
+        self.build()
+        self.assertEqual(self.mtime("blog/post.html"), 0)
+        with open(os.path.join(self.dest, "index.html")) as f:
+            self.assertIn("Home again", f.read())
+        self.assertNotEqual(before, 0)
+
+    def test_rebuilds_when_template_or_basepath_changes(self):
+        self.build()
+        os.utime(os.path.join(self.dest, "blog/post.html"), ns=(0, 0))
+        self.build(basepath="/site/")
+        self.assertNotEqual(self.mtime("blog/post.html"), 0)
+
+        os.utime(os.path.join(self.dest, "blog/post.html"), ns=(0, 0))
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build(basepath="/site/")
+        self.assertNotEqual(self.mtime("blog/post.html"), 0)
+
+    def test_removes_outputs_of_deleted_sources(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><a href="/">{{ Content }}</a>')
+        for i in range(6):
+            with open(os.path.join(self.content, "blog", f"post{i}.md"), "w") as f:
+                f.write(f"# Post {i}\n\nSome **bold** [link](/blog/post{i}) text")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, root):
+        files = {}
+        for dir_path, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dir_path, filename)
+                with open(path) as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        generate_pages_recursive(self.content, self.template, serial, "/base/")
+        generate_pages_recursive(self.content, self.template, parallel, "/base/", jobs=3)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_parallel_workers_get_options(self):
+        # the options go to each worker through the pool initializer
+        with open(os.path.join(self.content, "blog", "post4.md"), "a") as f:
+            f.write("\n\n![icon](/icon.png) ![photo](/photo.png)")
+        options = PageOptions(
+            images=ImageIndex({"/photo.png": [4, 3]}), inline=InlineAssets({"/icon.png": "data:image/png;base64,AA=="})
+        )
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        generate_pages_recursive(self.content, self.template, serial, "/base/", options=options)
+        generate_pages_recursive(self.content, self.template, parallel, "/base/", jobs=3, options=options)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+        html = self.read_tree(parallel)[os.path.join("blog", "post4.html")]
+        self.assertIn('<img src="data:image/png;base64,AA==" alt="icon">', html)
+        self.assertIn('<img src="/base/photo.png" alt="photo" width="4" height="3"', html)
+
+    def test_trace_matches_and_records_stages(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        traced = os.path.join(self.tmp.name, "traced")
+        generate_pages_recursive(self.content, self.template, plain, "/base/")
+        options = PageOptions(trace=True)
+        results = generate_pages_recursive(self.content, self.template, traced, "/base/", jobs=2, options=options)
+        self.assertEqual(self.read_tree(plain), self.read_tree(traced))
+        for result in results:
+            names = [event["name"] for event in result["trace"]]
+            self.assertEqual(
+                names, ["read", "parse.blocks", "parse.inline", "render", "template", "write", "page"]
+            )
+
+    def test_report(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        report_path = os.path.join(self.tmp.name, "report.json")
+        report = ReportOptions(report_path)
+        generate_pages_recursive(self.content, self.template, dest, "/base/", jobs=2, report=report)
+        with open(report_path) as f:
+            pages = json.load(f)["pages"]
+        self.assertEqual(len(pages), 6)
+        stats = pages[os.path.join("blog", "post0.html")]
+        self.assertEqual(stats["blocks"], 2)
+        self.assertEqual(stats["nodes"], 9)
+        self.assertEqual(stats["output_bytes"], os.path.getsize(os.path.join(dest, "blog", "post0.html")))
+        self.assertIn("parse.inline", stats["phases_ms"])
+
+    def test_targets_match_separate_builds(self):
+        with open(os.path.join(self.content, "blog", "post5.md"), "a") as f:
+            f.write("\n\n```\n<a href=\"/raw\">\0</a>\n```")
+        targets = [
+            (os.path.join(self.tmp.name, "root"), "/"),
+            (os.path.join(self.tmp.name, "base"), "/base/"),
+            (os.path.join(self.tmp.name, "deep"), "/a/b"),
+        ]
+        results = generate_targets(self.content, self.template, targets, jobs=2)
+        self.assertEqual(len(results), 18)
+        for dest_dir_path, basepath in targets:
+            separate = os.path.join(self.tmp.name, "separate")
+            generate_pages_recursive(self.content, self.template, separate, basepath)
+            self.assertEqual(self.read_tree(separate), self.read_tree(dest_dir_path))
+        with open(os.path.join(self.tmp.name, "base", "blog", "post0.html")) as f:
+            self.assertIn('<a href="/base/blog/post0">link</a>', f.read())
+
+    def test_targets_sync(self):
+        targets = [(os.path.join(self.tmp.name, "a"), "/"), (os.path.join(self.tmp.name, "b"), "/b/")]
+        options = PageOptions(sync=True)
+        generate_targets(self.content, self.template, targets, options=options)
+        with open(os.path.join(self.content, "blog", "post1.md"), "a") as f:
+            f.write("\n\nmore")
+        results = generate_targets(self.content, self.template, targets, options=options)
+        changed = sorted(os.path.relpath(r["dest_path"], self.tmp.name) for r in results if r["changed"])
+        self.assertEqual(changed, [os.path.join("a", "blog", "post1.html"), os.path.join("b", "blog", "post1.html")])
+
+    def test_sync_matches_and_reports_changes(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        synced = os.path.join(self.tmp.name, "synced")
+        generate_pages_recursive(self.content, self.template, plain, "/base/")
+        options = PageOptions(sync=True)
+        results = generate_pages_recursive(self.content, self.template, synced, "/base/", options=options)
+        self.assertEqual(self.read_tree(plain), self.read_tree(synced))
+        self.assertTrue(all(result["changed"] for result in results))
+
+        with open(os.path.join(self.content, "blog", "post2.md"), "a") as f:
+            f.write("\n\nmore")
+        results = generate_pages_recursive(self.content, self.template, synced, "/base/", jobs=2, options=options)
+        changed = [os.path.relpath(r["dest_path"], synced) for r in results if r["changed"]]
+        self.assertEqual(changed, [os.path.join("blog", "post2.html")])
+
+    def test_worker_error_names_file(self):
+        bad_path = os.path.join(self.content, "blog", "post3.md")
+        with open(bad_path, "w") as f:
+            f.write("no title here")
+        dest = os.path.join(self.tmp.name, "out")
+        with self.assertRaises(PageBuildError) as cm:
+            generate_pages_recursive(self.content, self.template, dest, "/", jobs=3)
+        self.assertEqual(cm.exception.from_path, bad_path)
+        self.assertIn("no title found", str(cm.exception))
+
+
+class TestStreamingPage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "page.md")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><a href="/">{{ Content }}</a>')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, markdown, options):
+        with open(self.source, "w") as f:
+            f.write(markdown)
+        dest = os.path.join(self.tmp.name, "out", "page.html")
+        result = generate_page(self.source, self.template, dest, "/base/", options)
+        with open(dest) as f:
+            return result, f.read()
+
+    def test_stream_matches_whole_file(self):
+        documents = [
+            "# Title\n\nSome **bold** [link](/a) ![img](/b.png)\n\n- one\n- two\n",
+            "intro\n\n# Title\n\n```\ncode\n\nmore code\n```\n\n> quote",
+            "# Title\n\n1. a\n2. b\n\n\n\n  end  \n\n",
+            "# Title",
+        ]
+        for markdown in documents:
+            _, whole = self.render(markdown, PageOptions())
+            _, streamed = self.render(markdown, PageOptions(stream_bytes=0))
+            self.assertEqual(whole, streamed)
+
+    def test_minify(self):
+        markdown = "# Title\n\nSome **bold** [link](/a)\n\n```\nx  =  1\n```\n"
+        _, plain = self.render(markdown, PageOptions())
+        _, whole = self.render(markdown, PageOptions(minify=True))
+        _, streamed = self.render(markdown, PageOptions(minify=True, stream_bytes=0))
+        _, traced = self.render(markdown, PageOptions(minify=True, trace=True))
+        self.assertEqual(whole, minify_html(plain))
+        self.assertEqual(streamed, whole)
+        self.assertEqual(traced, whole)
+        self.assertIn('<a href=/base/a>link</a>', whole)
+        self.assertIn("<pre><code>x  =  1\n</code></pre>", whole)
+
+    def test_targets_stream_large_sources(self):
+        with open(self.source, "w") as f:
+            f.write("# Title\n\nSome [link](/a)\n")
+        targets = [(os.path.join(self.tmp.name, "a", "page.html"), "/"), (os.path.join(self.tmp.name, "b", "page.html"), "/b/")]
+        results = generate_page_targets(self.source, self.template, targets, PageOptions(stream_bytes=0, trace=True))
+        for result, (dest_path, basepath) in zip(results, targets):
+            self.assertIn("stream", [event["name"] for event in result["trace"]])
+            with open(dest_path) as f:
+                self.assertIn(f'<a href="{basepath}a">link</a>', f.read())
+
+    def test_stream_sync_and_report(self):
+        markdown = "# Title\n\ntext with `code`\n"
+        options = PageOptions(stream_bytes=0, sync=True, report=True)
+        result, _ = self.render(markdown, options)
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["stats"]["blocks"], 2)
+        self.assertEqual(result["stats"]["nodes"], 6)
+        result, _ = self.render(markdown, options)
+        self.assertFalse(result["changed"])
+
+    def test_stream_threshold(self):
+        options = PageOptions(stream_bytes=1000, trace=True)
+        result, _ = self.render("# Title", options)
+        self.assertIn("parse.inline", [event["name"] for event in result["trace"]])
+        result, _ = self.render("# Title\n\n" + "word " * 300, options)
+        self.assertIn("stream", [event["name"] for event in result["trace"]])
+
+    def test_iter_lines_matches_split(self):
+        for text in ["", "a", "a\n", "a\n\nb", "a\n\n\n"]:
+            with open(self.source, "w") as f:
+                f.write(text)
+            with open(self.source) as f:
+                self.assertEqual(list(iter_lines(f)), text.split("\n"))
+
+    def test_find_title(self):
+        with open(self.source, "w") as f:
+            f.write("intro\n# Title\n# Second\n")
+        self.assertEqual(find_title(self.source), "Title")
+        with open(self.source, "w") as f:
+            f.write("no title\n")
+        with self.assertRaises(ValueError):
+            find_title(self.source)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
 from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_to_html_props(self):
@@ -49,6 +51,11 @@ class TestHTMLNode(unittest.TestCase):
             "HTMLNode(p, What a strange world, children: None, {'class': 'primary'})",
         )
 
+    def test_slots(self):
+        leaf = LeafNode("b", "bold")
+        for node in [HTMLNode("p"), leaf, ParentNode("p", [leaf])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from imageindex import ImageIndex, build_image_index, image_size
+from text_node_to_html_node import text_node_to_html_node
+from textnode import TextNode, TextType
+from urls import UrlResolver
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 8
+
+
+def webp(chunk, payload):
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def jpeg(width, height, orientation=None):
+    data = b"\xff\xd8"
+    data += b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    if orientation is not None:
+        tiff = b"MM\x00\x2a" + struct.pack(">I", 8) + struct.pack(">H", 1)
+        tiff += struct.pack(">HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack(">I", 0)
+        exif = b"Exif\x00\x00" + tiff
+        data += b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif
+    data += b"\xff\xdb" + struct.pack(">H", 67) + b"\x00" * 65
+    data += b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return data + b"\xff\xda" + b"\x00" * 64 + b"\xff\xd9"
+
+
+class TestImageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.cache_path = os.path.join(self.tmp.name, "cache", "sizes.json")
+        os.makedirs(os.path.join(self.static, "images"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, data):
+        path = os.path.join(self.static, rel_path)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_image_size(self):
+        cases = [
+            (png(640, 480), [640, 480]),
+            (gif(32, 16), [32, 16]),
+            (webp(b"VP8X", b"\x00" * 4 + (399).to_bytes(3, "little") + (299).to_bytes(3, "little")), [400, 300]),
+            (webp(b"VP8L", b"\x2f" + ((120 - 1) | ((90 - 1) << 14)).to_bytes(4, "little") + b"\x00"), [120, 90]),
+            (webp(b"VP8 ", b"\x00" * 3 + b"\x9d\x01\x2a" + struct.pack("<HH", 50, 70) + b"\x00" * 4), [50, 70]),
+            (jpeg(800, 600), [800, 600]),
+            (jpeg(800, 600, orientation=1), [800, 600]),
+            (jpeg(800, 600, orientation=6), [600, 800]),
+        ]
+        for i, (data, size) in enumerate(cases):
+            self.assertEqual(image_size(self.write(f"image{i}", data)), size)
+
+    def test_unreadable_images(self):
+        for data in [b"", b"not an image", png(1, 1)[:20], gif(1, 1)[:8], b"\xff\xd8\xff\xe0\x00", b"\xff\xd8\x00"]:
+            self.assertIsNone(image_size(self.write("broken", data)))
+
+    def test_jpeg_scan_is_bounded(self):
+        # a long run of empty segments ends the scan before the frame header
+        data = b"\xff\xd8" + b"\xff\xfe\x00\x02" * 1000 + jpeg(10, 10)[2:]
+        self.assertIsNone(image_size(self.write("long.jpg", data)))
+
+    def test_build_image_index(self):
+        self.write("images/a.png", png(10, 20))
+        self.write("images/b.gif", gif(3, 4))
+        self.write("images/notes.txt", b"text")
+        self.write("images/fake.jpg", b"text")
+        index = build_image_index(self.static, self.cache_path)
+        self.assertEqual(index.sizes, {"/images/a.png": [10, 20], "/images/b.gif": [3, 4]})
+
+        again = build_image_index(self.static, self.cache_path)
+        self.assertEqual(again.digest, index.digest)
+        self.write("images/a.png", png(11, 20))
+        changed = build_image_index(self.static, self.cache_path)
+        self.assertEqual(changed.sizes["/images/a.png"], [11, 20])
+        self.assertNotEqual(changed.digest, index.digest)
+
+    def test_attributes(self):
+        index = ImageIndex({"/images/a.png": [10, 20]})
+        expected = {"width": "10", "height": "20", "loading": "lazy", "decoding": "async"}
+        self.assertEqual(index.attributes("/images/a.png"), expected)
+        self.assertEqual(index.attributes("/images/a.png?v=2#x"), expected)
+        self.assertEqual(index.attributes("/images/b.png"), {})
+
+    def test_image_nodes(self):
+        resolver = UrlResolver("/site/", images=ImageIndex({"/images/a.png": [10, 20]}))
+        node = text_node_to_html_node(TextNode("a", TextType.IMAGE, "/images/a.png"), resolver)
+        self.assertEqual(
+            node.to_html(),
+            '<img src="/site/images/a.png" alt="a" width="10" height="20" loading="lazy" decoding="async">',
+        )
+        for url in ["https://example.com/images/a.png", "images/a.png", "/images/b.png"]:
+            node = text_node_to_html_node(TextNode("a", TextType.IMAGE, url), resolver)
+            self.assertNotIn("width", node.props)
+        self.assertNotEqual(resolver.context, UrlResolver("/site/").context)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+
+from gencontent import PageOptions, generate_page
+from linkcheck import broken_links, check_links, check_site_links, link_candidates
+from outputsync import dest_state_path
+
+
+class TestLinkCandidates(unittest.TestCase):
+    def test_root_relative(self):
+        self.assertEqual(link_candidates("/site/a.png", "index.html", "/site/"), ["a.png", "a.png/index.html"])
+        self.assertEqual(link_candidates("/site/blog/", "index.html", "/site/"), ["blog/index.html"])
+        self.assertEqual(link_candidates("/site/", "blog/index.html", "/site/"), ["index.html"])
+        self.assertEqual(link_candidates("/site", "blog/index.html", "/site/"), ["index.html"])
+
+    def test_outside_site(self):
+        self.assertEqual(link_candidates("/other/a", "index.html", "/site/"), [])
+        self.assertEqual(link_candidates("../../a", "blog/index.html", "/site/"), [])
+
+    def test_relative(self):
+        self.assertEqual(
+            link_candidates("../tom?x=1#top", "blog/post/index.html", "/"),
+            ["blog/tom", "blog/tom/index.html"],
+        )
+        self.assertEqual(link_candidates("my%20file.txt", "index.html", "/"), ["my file.txt", "my file.txt/index.html"])
+
+    def test_unchecked(self):
+        for url in ["https://example.com/", "//cdn.example.com/a.js", "mailto:a@b.c", "#top", ""]:
+            self.assertIsNone(link_candidates(url, "index.html", "/"))
+
+
+class TestCheckLinks(unittest.TestCase):
+    def test_broken_links(self):
+        index = {"index.html", "blog/index.html", "a.png"}
+        urls = ["/", "/blog", "/a.png", "/b.png", "https://example.com/", "missing.html"]
+        self.assertEqual(broken_links("index.html", urls, index, "/"), ["/b.png", "missing.html"])
+
+    def test_parallel_matches_serial(self):
+        index = {f"p{i}.html" for i in range(0, 600, 2)}
+        checks = [(f"p{i}.html", [f"p{i + 1}.html", f"/p{i + 2}.html"]) for i in range(600)]
+        self.assertEqual(check_links(checks, index, "/", jobs=2), check_links(checks, index, "/"))
+
+
+class TestCheckSiteLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.template_path = os.path.join(self.root, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write('<link href="/index.css"><title>{{ Title }}</title>{{ Content }}')
+        self.dest_dir_path = os.path.join(self.root, "docs")
+        self.state_dir_path = os.path.join(self.root, "cache", "links")
+        os.makedirs(self.dest_dir_path)
+        self.css_path = os.path.join(self.dest_dir_path, "index.css")
+        self.static = {"outputs": [(self.css_path, True)], "removed": []}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def build(self, name, markdown):
+        from_path = os.path.join(self.root, name + ".md")
+        with open(from_path, "w") as f:
+            f.write(markdown)
+        dest_path = os.path.join(self.dest_dir_path, name + ".html")
+        return generate_page(from_path, self.template_path, dest_path, "/site/", PageOptions(links=True))
+
+    def check(self, results, incremental=False):
+        return check_site_links(
+            self.dest_dir_path,
+            "/site/",
+            self.static,
+            results,
+            self.template_path,
+            incremental=incremental,
+            state_dir_path=self.state_dir_path,
+        )
+
+    def test_reports_broken_links_with_source(self):
+        results = [
+            self.build("index", "# Home\n\n[b](/b.html) [c](/c.html) ![x](/x.png)"),
+            self.build("b", "# B\n\n[home](/) [c](c.html)"),
+        ]
+        broken = self.check(results)
+        self.assertEqual(
+            broken,
+            [
+                (os.path.join(self.root, "b.md"), "c.html"),
+                (os.path.join(self.root, "index.md"), "/site/c.html"),
+                (os.path.join(self.root, "index.md"), "/site/x.png"),
+            ],
+        )
+        self.assertTrue(os.path.exists(dest_state_path(self.state_dir_path, self.dest_dir_path)))
+        self.assertEqual(sorted(os.listdir(self.dest_dir_path)), ["b.html", "index.html"])
+
+    def test_template_links_checked(self):
+        self.static = {"outputs": [], "removed": []}
+        broken = self.check([self.build("index", "# Home\n\nhi")])
+        self.assertEqual(broken, [(self.template_path, "/site/index.css")])
+
+    def test_incremental_rechecks_pages_linking_to_new_outputs(self):
+        index = self.build("index", "# Home\n\n[c](/c.html)")
+        self.check([index, self.build("b", "# B\n\n[home](/)")])
+
+        # nothing re-rendered: findings come from the links manifest
+        skipped = [{"dest_path": index["dest_path"], "changed": False}]
+        b_skipped = {"dest_path": os.path.join(self.dest_dir_path, "b.html"), "changed": False}
+        self.assertEqual(len(self.check(skipped + [b_skipped], incremental=True)), 1)
+
+        # adding c.html fixes the link on the skipped index page
+        broken = self.check(skipped + [b_skipped, self.build("c", "# C\n\nhi")], incremental=True)
+        self.assertEqual(broken, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
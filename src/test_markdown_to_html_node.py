@@ -1,6 +1,7 @@
 import unittest
 
 from markdown_to_html_node import markdown_to_html_node
+from urls import UrlResolver
 
 class TestMarkdownToHtmlNode(unittest.TestCase):
     def test_paragraphs(self):
@@ -65,5 +66,38 @@ class TestMarkdownToHtmlNode(unittest.TestCase):
             "<div><ul><li>This is a <b>bold</b> list item</li><li>This is another list item with <i>italic</i> text</li><li>This is a third item with <code>code</code></li></ul></div>",
         )
 
+    def test_codeblock_with_empty_lines(self):
+        md = """
+```
+first
+
+second
+```
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><pre><code>first\n\nsecond\n</code></pre></div>",
+        )
+
+    def test_resolver_leaves_code_alone(self):
+        md = """
+[home](/) and ![logo](/logo.png)
+
+```
+<a href="/raw">raw</a>
+```
+"""
+
+        node = markdown_to_html_node(md, resolver=UrlResolver("/site/"))
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/site/">home</a> and <img src="/site/logo.png" alt="logo"></p>'
+            '<pre><code><a href="/raw">raw</a>\n</code></pre></div>',
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from minify import minify_chunks, minify_html
+
+
+class TestMinify(unittest.TestCase):
+    def test_drops_whitespace_between_block_tags(self):
+        html = "<!doctype html>\n<html>\n  <head>\n    <title> A  page </title>\n  </head>\n  <body>\n  </body>\n</html>\n"
+        self.assertEqual(minify_html(html), "<!doctype html><html><head><title>A page</title></head><body></body></html>")
+
+    def test_keeps_one_space_between_inline_elements(self):
+        self.assertEqual(minify_html("<p><b>a</b>  \n <i>b</i></p>"), "<p><b>a</b> <i>b</i></p>")
+        self.assertEqual(minify_html("<p>a  <b>b</b>\tc</p>"), "<p>a <b>b</b> c</p>")
+
+    def test_preserves_pre_and_code(self):
+        html = "<div>\n<pre><code>def f():\n    return  1\n</code></pre>\n<p>use <code>a  b</code> here</p></div>"
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre><code>def f():\n    return  1\n</code></pre><p>use <code>a  b</code> here</p></div>",
+        )
+
+    def test_raw_text_with_tags_inside_pre(self):
+        html = "<pre><code><p>  x  </p></CODE></pre>"
+        self.assertEqual(minify_html(html), html)
+
+    def test_non_breaking_space_kept(self):
+        self.assertEqual(minify_html("<p>a  b</p>"), "<p>a  b</p>")
+
+    def test_literal_less_than_in_text(self):
+        self.assertEqual(minify_html("<p>< Back  Home</p>"), "<p>< Back Home</p>")
+        self.assertEqual(minify_html("<p>a <3 b</p>"), "<p>a <3 b</p>")
+
+    def test_unquotes_safe_attribute_values(self):
+        self.assertEqual(
+            minify_html('<a href="/blog/x" title="two words" class="">x</a>'),
+            '<a href=/blog/x title="two words" class="">x</a>',
+        )
+        self.assertEqual(minify_html('<img src="a.png" alt=\'a=b\'>'), "<img src=a.png alt='a=b'>")
+
+    def test_void_and_self_closing_tags(self):
+        self.assertEqual(minify_html('<link href="/a/" rel="stylesheet" />'), "<link href=/a/ rel=stylesheet>")
+        self.assertEqual(minify_html('<svg><path d="M0"/></svg>'), "<svg><path d=M0 /></svg>")
+        self.assertEqual(minify_html("<svg><use href=/a/></svg>"), "<svg><use href=/a/></svg>")
+
+    def test_quoted_greater_than_in_attribute(self):
+        self.assertEqual(minify_html('<a title="a > b" href="x">y</a>'), '<a title="a > b" href=x>y</a>')
+
+    def test_comments_kept(self):
+        self.assertEqual(minify_html("<p>a <!-- b > c --> d</p>"), "<p>a <!-- b > c --> d</p>")
+
+    def test_same_output_for_any_chunking(self):
+        html = (
+            '<!doctype html>\n<html>\n<head><link href="/index.css" rel="stylesheet" /></head>\n<body>\n'
+            "<p>Some <b>bold</b>   text < 3</p>\n<pre><code>  keep\n   this</code></pre>\n"
+            '<ul>\n  <li><a href="/x">x</a></li>\n</ul><!-- note -->\n</body>\n</html>\n'
+        )
+        expected = minify_html(html)
+        for size in [1, 2, 3, 5, 8, 13]:
+            chunks = [html[i : i + size] for i in range(0, len(html), size)]
+            self.assertEqual("".join(minify_chunks(chunks)), expected)
+
+    def test_unterminated_tag_passed_through(self):
+        self.assertEqual(minify_html('<p>a <a href="x'), '<p>a <a href="x')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from outputsync import remove_orphans, sync_bytes, write_changed_list
+
+
+class TestOutputSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sync_bytes_writes_only_changes(self):
+        path = os.path.join(self.root, "a", "index.html")
+        self.assertTrue(sync_bytes(path, b"<p>hi</p>"))
+        os.utime(path, ns=(0, 0))
+        self.assertFalse(sync_bytes(path, b"<p>hi</p>"))
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+        self.assertTrue(sync_bytes(path, b"<p>ho</p>"))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>ho</p>")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["index.html"])
+
+    def test_remove_orphans(self):
+        keep = os.path.join(self.root, "index.html")
+        orphan = os.path.join(self.root, "old", "page.html")
+        manifest = os.path.join(self.root, ".build-manifest.json")
+        for path in [keep, orphan, manifest]:
+            sync_bytes(path, b"x")
+        removed = remove_orphans(self.root, [keep], keep_names=[".build-manifest.json"])
+        self.assertEqual(removed, [orphan])
+        self.assertFalse(os.path.exists(os.path.dirname(orphan)))
+        self.assertTrue(os.path.exists(manifest))
+
+    def test_write_changed_list(self):
+        path = os.path.join(self.root, "changes.json")
+        write_changed_list(
+            path,
+            self.root,
+            [os.path.join(self.root, "b.html"), os.path.join(self.root, "a.html")],
+            [os.path.join(self.root, "gone.html")],
+        )
+        with open(path) as f:
+            self.assertEqual(json.load(f), {"changed": ["a.html", "b.html"], "removed": ["gone.html"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
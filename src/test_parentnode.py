@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from parentnode import ParentNode
@@ -46,5 +47,36 @@ class TestParentNode(unittest.TestCase):
             "<div><span>First child</span><p>Second child</p><b>Third child</b></div>"
         )
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "a "), LeafNode("b", "bold")], {"class": "x"}),
+                LeafNode("img", "", {"src": "/a.png", "alt": "a"}),
+            ],
+        )
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), '<div><p class="x">a <b>bold</b></p><img src="/a.png" alt="a"></div>')
+
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode("b", "x")
+        for _ in range(10000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 10000 + "<b>x</b>"))
+        self.assertTrue(html.endswith("</span>" * 10000))
+
+    def test_write_to(self):
+        node = ParentNode("div", [LeafNode("span", "child"), LeafNode(None, "tail")])
+        out = io.StringIO()
+        node.write_to(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+
+    def test_node_count(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "b")]), LeafNode("hr", "")])
+        self.assertEqual(node.node_count(), 5)
+        self.assertEqual(LeafNode("b", "x").node_count(), 1)
+
 if __name__ == "__main__":
     unittest.main()
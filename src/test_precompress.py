@@ -0,0 +1,88 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from outputsync import dest_state_path
+from precompress import compressed_paths, precompress_outputs, remove_precompressed
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.state = os.path.join(self.tmp.name, "cache", "compress")
+        os.makedirs(self.dest)
+        self.page = self.write("index.html", "<p>hello</p>" * 200)
+        self.css = self.write("index.css", "body { margin: 0 }\n" * 100)
+        self.small = self.write("small.html", "<p>hi</p>")
+        self.image = self.write("a.png", "png" * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.dest, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def compress(self, **kwargs):
+        paths = [self.page, self.css, self.small, self.image]
+        return precompress_outputs(self.dest, paths, state_dir_path=self.state, **kwargs)
+
+    def test_compresses_text_outputs_above_threshold(self):
+        result = self.compress()
+        self.assertEqual((result["compressed"], result["reused"], result["skipped"]), (2, 0, 1))
+        with gzip.open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), ("<p>hello</p>" * 200).encode("utf-8"))
+        self.assertFalse(os.path.exists(self.small + ".gz"))
+        self.assertFalse(os.path.exists(self.image + ".gz"))
+        self.assertLess(result["gzip_bytes"], result["input_bytes"])
+        outputs = [path for path, _ in result["outputs"]]
+        self.assertEqual(outputs, compressed_paths(self.page) + compressed_paths(self.css))
+        self.assertTrue(os.path.exists(dest_state_path(self.state, self.dest)))
+        written = [self.page, self.css, self.small, self.image] + outputs
+        self.assertEqual(sorted(os.listdir(self.dest)), sorted(os.path.basename(path) for path in written))
+
+    def test_reuses_unchanged_outputs(self):
+        self.compress()
+        self.write("index.css", "body { margin: 1px }\n" * 100)
+        result = self.compress()
+        self.assertEqual((result["compressed"], result["reused"]), (1, 1))
+        self.assertEqual(result["outputs"][0], (self.page + ".gz", False))
+        self.assertEqual(self.compress(level=1)["compressed"], 2)
+
+    def test_output_is_reproducible(self):
+        self.compress()
+        with open(self.page + ".gz", "rb") as f:
+            first = f.read()
+        os.remove(self.page + ".gz")
+        self.compress()
+        with open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_removes_stale_siblings(self):
+        self.compress()
+        os.remove(self.css)
+        result = precompress_outputs(self.dest, [self.page], state_dir_path=self.state)
+        self.assertEqual(result["removed"], compressed_paths(self.css))
+        self.assertFalse(os.path.exists(self.css + ".gz"))
+
+    def test_remove_precompressed(self):
+        self.compress()
+        removed = remove_precompressed(self.dest, self.state)
+        self.assertEqual(sorted(removed), sorted(compressed_paths(self.page) + compressed_paths(self.css)))
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertTrue(os.path.exists(self.page))
+        self.assertFalse(os.path.exists(dest_state_path(self.state, self.dest)))
+        self.assertEqual(remove_precompressed(self.dest, self.state), [])
+
+    def test_parallel(self):
+        result = self.compress(jobs=2)
+        self.assertEqual(result["compressed"], 2)
+        self.assertTrue(os.path.exists(self.css + ".gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from block_to_block_type import block_to_block_type
+from block_type import BlockType
+from markdown_to_blocks import markdown_to_blocks
+from scan_blocks import scan_blocks
+
+
+def scan(md, fences=True):
+    return [(block_type, "\n".join(lines)) for block_type, lines in scan_blocks(md.split("\n"), fences)]
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_types(self):
+        md = """
+# Heading
+
+Some paragraph
+spanning lines
+
+- one
+- two
+
+1. one
+2. two
+
+> quote
+> more
+
+```
+code
+```
+"""
+        self.assertEqual(
+            [block_type for block_type, _ in scan(md)],
+            [
+                BlockType.HEADING,
+                BlockType.PARAGRAPH,
+                BlockType.UNORDERED_LIST,
+                BlockType.ORDERED_LIST,
+                BlockType.QUOTE,
+                BlockType.CODE,
+            ],
+        )
+
+    def test_matches_split_blocks(self):
+        for md in [
+            "",
+            "   \n\n   \n\n   ",
+            "First block\n\n\n\n\nSecond block\n\n\n\nThird block",
+            "\n    This is **bolded** paragraph\n\n    - This is a list\n    - with items\n    ",
+            "#\nnot empty heading\n\n###\n\n1. a\n3. b\n\n> a\nb",
+            "  \n  lead\ntrail  \n  \n\nnext",
+        ]:
+            expected = [(block_to_block_type(block), block) for block in markdown_to_blocks(md)]
+            self.assertEqual(scan(md), expected, repr(md))
+
+    def test_fence_keeps_empty_lines(self):
+        md = "Intro\n\n```\nfirst\n\nsecond\n```\n\nOutro"
+        self.assertEqual(
+            scan(md),
+            [
+                (BlockType.PARAGRAPH, "Intro"),
+                (BlockType.CODE, "```\nfirst\n\nsecond\n```"),
+                (BlockType.PARAGRAPH, "Outro"),
+            ],
+        )
+
+    def test_fence_closed_before_text(self):
+        # the fence closes inside the block, so the empty line after the
+        # paragraph ends it
+        md = "# T\n\n```py\na\n```\nPara after fence.\n\nMiddle paragraph.\n\n```sh\nb\n```"
+        self.assertEqual(
+            scan(md),
+            [
+                (BlockType.HEADING, "# T"),
+                (BlockType.PARAGRAPH, "```py\na\n```\nPara after fence."),
+                (BlockType.PARAGRAPH, "Middle paragraph."),
+                (BlockType.CODE, "```sh\nb\n```"),
+            ],
+        )
+        self.assertEqual(scan(md), scan(md, fences=False))
+
+    def test_fence_reopened_in_block(self):
+        md = "```\na\n```\n```\nb\n\nc\n```\n\nOutro"
+        self.assertEqual(
+            scan(md),
+            [(BlockType.CODE, "```\na\n```\n```\nb\n\nc\n```"), (BlockType.PARAGRAPH, "Outro")],
+        )
+
+    def test_unclosed_fence_splits_on_empty_lines(self):
+        md = "```\nfirst\n\nsecond"
+        self.assertEqual(scan(md), scan(md, fences=False))
+        self.assertEqual(
+            scan(md),
+            [(BlockType.PARAGRAPH, "```\nfirst"), (BlockType.PARAGRAPH, "second")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
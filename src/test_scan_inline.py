@@ -0,0 +1,68 @@
+import random
+import unittest
+
+from scan_inline import scan_inline
+from text_to_textnodes import text_to_textnodes_multipass
+from textnode import TextNode, TextType
+
+
+class TestScanInline(unittest.TestCase):
+    def assertSameAsMultipass(self, text):
+        try:
+            expected = text_to_textnodes_multipass(text)
+        except ValueError:
+            with self.assertRaises(ValueError):
+                scan_inline(text)
+            return
+        self.assertListEqual(expected, scan_inline(text), repr(text))
+
+    def test_mixed(self):
+        text = "**Bold** text with _italic_ and `code` plus [link](https://test.com) and ![img](pic.png)"
+        self.assertListEqual(
+            scan_inline(text),
+            [
+                TextNode("Bold", TextType.BOLD),
+                TextNode(" text with ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("code", TextType.CODE),
+                TextNode(" plus ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://test.com"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "pic.png"),
+            ],
+        )
+
+    def test_unclosed_delimiters_raise(self):
+        for text in ["**bold", "an _italic", "a `code", "_a **b_ c**", "`a _b` c_"]:
+            with self.assertRaises(ValueError):
+                scan_inline(text)
+
+    def test_empty_sections_split_text(self):
+        self.assertListEqual(
+            scan_inline("a****b"),
+            [TextNode("a", TextType.TEXT), TextNode("b", TextType.TEXT)],
+        )
+        self.assertListEqual(scan_inline(""), [])
+
+    def test_delimiters_inside_other_spans(self):
+        for text in [
+            "**bold with _under_ and `tick`**",
+            "_it with **not bold_",
+            "`code with [link](url)`",
+            "[link with **bold** text](/x)",
+            "![a](b)[c](d)!x",
+            "!![a](b)",
+        ]:
+            self.assertSameAsMultipass(text)
+
+    def test_differential_fuzz(self):
+        alphabet = ["**", "*", "_", "`", "!", "[", "]", "(", ")", "a", " ", "[t](u)", "![i](p.png)"]
+        rng = random.Random(0)
+        for _ in range(5000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            self.assertSameAsMultipass(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
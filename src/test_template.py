@@ -0,0 +1,53 @@
+import io
+import os
+import tempfile
+import unittest
+
+from template import compile_template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title><p>{{ Content }}</p>", "/")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<b>there</b>"),
+            "<title>Hi</title><p><b>there</b></p>",
+        )
+
+    def test_repeated_placeholder(self):
+        template = compile_template("{{ Title }}|{{ Title }}", "/")
+        self.assertEqual(template.render(Title="a", Content=""), "a|a")
+
+    def test_write_to_streams_chunks(self):
+        template = compile_template("<t>{{ Title }}</t>{{ Content }}|{{ Content }}", "/")
+        out = io.StringIO()
+        template.write_to(out, Title="T", Content=iter(["<p>", "x", "</p>"]))
+        self.assertEqual(out.getvalue(), "<t>T</t><p>x</p>|<p>x</p>")
+
+    def test_basepath_applied_to_literals(self):
+        template = compile_template(
+            '<link href="/index.css" /><img src="/a.png">{{ Content }}', "/site/"
+        )
+        self.assertEqual(
+            template.segments[0], '<link href="/site/index.css" /><img src="/site/a.png">'
+        )
+        self.assertEqual(
+            template.render(Title="", Content='<a href="/x">x</a>'),
+            '<link href="/site/index.css" /><img src="/site/a.png"><a href="/x">x</a>',
+        )
+
+    def test_load_template_recompiles_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            first = load_template(path, "/")
+            self.assertIs(first, load_template(path, "/"))
+            with open(path, "w") as f:
+                f.write("<h2>{{ Title }}</h2>!")
+            second = load_template(path, "/")
+            self.assertEqual(second.render(Title="t", Content=""), "<h2>t</h2>!")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 
 from textnode import TextNode, TextType
 from text_node_to_html_node import text_node_to_html_node
+from urls import UrlResolver
 
 class TestTextNode(unittest.TestCase):
     def test_text(self):
@@ -42,6 +43,15 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": "https://example.com/image.jpg", "alt": "Alt text"})
 
+    def test_resolver(self):
+        resolver = UrlResolver("/site/")
+        link = text_node_to_html_node(TextNode("home", TextType.LINK, "/blog"), resolver)
+        self.assertEqual(link.props, {"href": "/site/blog"})
+        image = text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/a.png"), resolver)
+        self.assertEqual(image.props, {"src": "/site/a.png", "alt": "alt"})
+        text = text_node_to_html_node(TextNode('href="/x"', TextType.TEXT), resolver)
+        self.assertEqual(text.value, 'href="/x"')
+
     def test_unsupported_text_type(self):
         node = TextNode("Test", TextType.TEXT)
         # Use object.__setattr__ to bypass type checking for testing purposes
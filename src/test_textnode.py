@@ -34,5 +34,13 @@ class TestTextNode(unittest.TestCase):
             "TextNode(This is a text node, text, https://www.boot.dev)", repr(node)
         )
 
+    def test_coerces_raw_text_type(self):
+        node = TextNode("This is a text node", "bold")
+        self.assertIs(node.text_type, TextType.BOLD)
+
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from assets import AssetManifest
+from urls import LinkRecorder, UrlResolver, resolve_attributes, url_resolver
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_root_relative(self):
+        resolver = UrlResolver("/site/")
+        self.assertEqual(resolver.resolve("/"), "/site/")
+        self.assertEqual(resolver.resolve("/blog/post"), "/site/blog/post")
+        self.assertEqual(resolver.resolved, {"/": "/site/", "/blog/post": "/site/blog/post"})
+
+    def test_other_urls_unchanged(self):
+        resolver = UrlResolver("/site/")
+        for url in ["https://example.com/", "//cdn.example.com/a.js", "blog/post", "#top", "mailto:a@b.c", ""]:
+            self.assertEqual(resolver.resolve(url), url)
+
+    def test_basepath_without_trailing_slash(self):
+        self.assertEqual(UrlResolver("/site").resolve("/a"), "/site/a")
+
+    def test_root_basepath(self):
+        self.assertEqual(UrlResolver("/").resolve("/a"), "/a")
+
+    def test_resolve_attributes(self):
+        html = '<link href="/index.css"><img src="/a.png"><a data-href="/x" href="//cdn/y">y</a>'
+        self.assertEqual(
+            resolve_attributes(html, UrlResolver("/site/")),
+            '<link href="/site/index.css"><img src="/site/a.png"><a data-href="/x" href="//cdn/y">y</a>',
+        )
+        self.assertEqual(resolve_attributes(html, UrlResolver("/")), html)
+
+    def test_url_resolver_is_shared(self):
+        self.assertIs(url_resolver("/site/"), url_resolver("/site/"))
+
+    def test_assets(self):
+        assets = AssetManifest({"index.css": "index.0123456789.css", "images/a.png": "images/a.abcdef0123.png"})
+        resolver = UrlResolver("/", assets)
+        self.assertEqual(resolver.resolve("/index.css"), "/index.0123456789.css")
+        self.assertEqual(resolver.resolve("/images/a.png?v=1#x"), "/images/a.abcdef0123.png?v=1#x")
+        self.assertEqual(resolver.resolve("/blog/post"), "/blog/post")
+        self.assertEqual(resolver.resolve("images/a.png"), "images/a.png")
+        self.assertEqual(UrlResolver("/site/", assets).resolve("/index.css"), "/site/index.0123456789.css")
+        self.assertNotEqual(resolver.context, UrlResolver("/").context)
+        self.assertIsNot(url_resolver("/", assets), url_resolver("/"))
+
+    def test_link_recorder(self):
+        recorder = LinkRecorder(UrlResolver("/site/"))
+        self.assertEqual(recorder.resolve("/a"), "/site/a")
+        recorder.resolve("https://example.com/")
+        recorder.saw_links(["/site/b", "c.png"])
+        self.assertEqual(recorder.urls, ["/site/a", "https://example.com/", "/site/b", "c.png"])
+        block = recorder.recorder()
+        block.resolve("/d")
+        self.assertEqual((block.urls, recorder.urls[-1]), (["/site/d"], "c.png"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 from textnode import TextType
 from leafnode import LeafNode
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, resolver=None):
+    # resolver: a UrlResolver applied to link and image urls, which may also
+    # add width/height attributes to local images or inline small ones
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
     if text_node.text_type == TextType.BOLD:
@@ -11,7 +13,15 @@ def text_node_to_html_node(text_node):
     if text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     if text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+        return LeafNode("a", text_node.text, {"href": url})
     if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        if resolver is None:
+            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        src = resolver.data_uri(text_node.url)
+        if src is None:
+            src = resolver.resolve(text_node.url)
+        props = {"src": src, "alt": text_node.text}
+        props.update(resolver.image_attributes(text_node.url))
+        return LeafNode("img", "", props)
     raise Exception("Unsupported text type")
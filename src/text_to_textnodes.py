@@ -1,9 +1,16 @@
 from textnode import TextNode, TextType
+from scan_inline import scan_inline
 from split_nodes_delimiter import split_nodes_delimiter
 from split_nodes_image import split_nodes_image
 from split_nodes_link import split_nodes_link
 
-def text_to_textnodes(text):
+def text_to_textnodes(text, single_pass=True):
+    if single_pass:
+        return scan_inline(text)
+    return text_to_textnodes_multipass(text)
+
+
+def text_to_textnodes_multipass(text):
     text_nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_delimiter(text_nodes, "**", TextType.BOLD)
     nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
@@ -9,9 +9,14 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url", "alt")
+
     def __init__(self, text, text_type, url = None, alt = None):
         self.text = text
-        self.text_type = TextType(text_type)
+        # internal callers already pass TextType members, only coerce raw values
+        if text_type.__class__ is not TextType:
+            text_type = TextType(text_type)
+        self.text_type = text_type
         self.url = url
         self.alt = alt
 
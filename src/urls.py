@@ -0,0 +1,115 @@
+import re
+
+
+URL_ATTRIBUTE_RE = re.compile(r'(?<![\w-])(href|src)="([^"]*)"')
+URL_PATH_RE = re.compile(r"[^?#]*")
+
+
+class UrlResolver:
+    # Maps root-relative URLs ("/blog/x") under the site's basepath, and
+    # static files to their fingerprinted names when given an AssetManifest.
+    # With an ImageIndex it also knows the attributes for local images, and
+    # with InlineAssets the data uris of small ones.
+    # Other URLs (absolute, protocol-relative, relative, fragments) are
+    # returned unchanged.
+    def __init__(self, basepath="/", assets=None, images=None, inline=None):
+        self.basepath = basepath
+        self.prefix = basepath if basepath.endswith("/") else basepath + "/"
+        self.assets = assets
+        self.images = images
+        self.inline = inline
+        # everything that changes the resolved urls, for cache keys
+        self.context = basepath if assets is None else f"{basepath}\0{assets.digest}"
+        if images is not None:
+            self.context += f"\0images:{images.digest}"
+        if inline is not None:
+            self.context += f"\0inline:{inline.digest}"
+        self.passthrough = self.prefix == "/" and assets is None
+        self.resolved = {}
+
+    def resolve(self, url):
+        if self.passthrough or not url.startswith("/") or url.startswith("//"):
+            return url
+        resolved = self.resolved.get(url)
+        if resolved is None:
+            target = url
+            if self.assets is not None:
+                path = URL_PATH_RE.match(url).group(0)
+                target = self.assets.urls.get(path, path) + url[len(path) :]
+            resolved = self.prefix + target[1:]
+            self.resolved[url] = resolved
+        return resolved
+
+    def image_attributes(self, url):
+        # extra img attributes for an image url as written in the markdown
+        if self.images is None or not url.startswith("/") or url.startswith("//"):
+            return {}
+        return self.images.attributes(url)
+
+    def data_uri(self, url):
+        # the data uri to use in place of an image url, or None
+        if self.inline is None:
+            return None
+        return self.inline.data_uri(url)
+
+    def recorder(self):
+        # a LinkRecorder that records only the urls resolved through it
+        return LinkRecorder(self)
+
+    def saw_links(self, urls):
+        # called with the urls of html rendered earlier, e.g. a block cache hit
+        pass
+
+
+class LinkRecorder:
+    # A resolver for one page that also remembers every url it returns, so
+    # the link checker sees exactly the links text_node_to_html_node emits.
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.basepath = resolver.basepath
+        self.prefix = resolver.prefix
+        self.context = resolver.context
+        self.urls = []
+
+    def resolve(self, url):
+        resolved = self.resolver.resolve(url)
+        self.urls.append(resolved)
+        return resolved
+
+    def image_attributes(self, url):
+        return self.resolver.image_attributes(url)
+
+    def data_uri(self, url):
+        return self.resolver.data_uri(url)
+
+    def recorder(self):
+        return LinkRecorder(self.resolver)
+
+    def saw_links(self, urls):
+        self.urls.extend(urls)
+
+
+def resolve_attributes(html, resolver):
+    # resolves href and src attribute values in trusted html such as the template
+    if resolver.passthrough:
+        return html
+    return URL_ATTRIBUTE_RE.sub(lambda match: f'{match.group(1)}="{resolver.resolve(match.group(2))}"', html)
+
+
+_resolvers = {}
+
+
+def url_resolver(basepath, assets=None, images=None, inline=None):
+    # one resolver per basepath, asset manifest, image data and process, so
+    # its mapping is shared by pages
+    key = (
+        basepath,
+        assets.digest if assets is not None else None,
+        images.digest if images is not None else None,
+        inline.digest if inline is not None else None,
+    )
+    resolver = _resolvers.get(key)
+    if resolver is None:
+        resolver = UrlResolver(basepath, assets, images, inline)
+        _resolvers[key] = resolver
+    return resolver